@@ -1,11 +1,33 @@
 #!/usr/bin/env python3
 """
 Add a silver gradient overlay to the gold frame PNG with a blend mode
+
+The batch command applies the same effect tile by tile with in-place NumPy ops,
+fans files out over a process pool, and skips outputs whose input and settings
+are unchanged (by content hash):
+
+    python3 add_silver_gradient.py                           # the frame -> assets/silver/
+    python3 add_silver_gradient.py assets/themes -o out/ -j 8
+    python3 add_silver_gradient.py --compare-reference       # vs the whole-image functions
 """
 
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 from PIL import Image, ImageDraw, ImageEnhance, ImageChops
 import numpy as np
 
+FRAME_PATH = './assets/rectangle-vintage-gold-frame-horizontal-border-oriental-style-png.png'
+IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg', '.webp'}
+TILE_PIXELS = 1 << 18  # ~256K pixels per tile keeps the float32 scratch around 4 MB
+PIPELINE_VERSION = 1   # Bump when the effect changes so cached outputs are regenerated
+MANIFEST_NAME = '.silver-manifest.json'
+
 def create_silver_gradient(width, height):
     """Create a silver gradient overlay with metallic shine"""
     # Create arrays for efficient numpy operations
@@ -105,36 +127,296 @@ def overlay_blend_mode(base, overlay, opacity=0.7):
     
     return result
 
+# ===== TILED PIPELINE =====
+def overlay_lut(opacity):
+    """Overlay blend of every (base, overlay) uint8 pair, as overlay_blend_mode computes it
+
+    Flattened: index with base * 256 + overlay.
+    """
+    base = (np.arange(256, dtype=np.float32) / 255.0)[:, None]
+    over = (np.arange(256, dtype=np.float32) / 255.0)[None, :]
+    blended = np.where(base < 0.5, 2 * base * over, 1 - 2 * (1 - base) * (1 - over))
+    blended = base * (1 - opacity) + blended * opacity
+    return (np.clip(blended, 0, 1) * 255).astype(np.uint8).ravel()
+
+
+def alpha_lut():
+    """Alpha after overlay_blend_mode's float round trip (a / 255 * 255, truncated)"""
+    return ((np.arange(256, dtype=np.float32) / 255.0) * 255).astype(np.uint8)
+
+
+class TileScratch:
+    """Reusable per-image buffers, sized for the largest tile"""
+
+    def __init__(self, rows, width):
+        self.rgb = np.empty((3, rows, width), dtype=np.float32)  # Planar, so each channel is contiguous
+        self.lum = np.empty((rows, width), dtype=np.float32)
+        self.tmp = np.empty((rows, width), dtype=np.float32)
+        self.shifted = np.empty((3, rows, width), dtype=np.uint8)
+        self.wave = np.empty((rows, width), dtype=np.float64)
+        self.gradient = np.empty((2, rows, width), dtype=np.uint8)  # R/G share a value, B differs
+        self.index = np.empty((rows, width), dtype=np.uint16)
+        self.out = np.empty((rows, width), dtype=np.uint8)
+
+
+def silver_tile(tile, y0, height, x_wave, strength, lut, alpha, scratch):
+    """color_shift_to_silver + gradient overlay_blend_mode on one RGBA uint8 tile, in place
+
+    Arithmetic mirrors the whole-image functions operation for operation, so the
+    output is bit-identical to them.
+    """
+    rows = tile.shape[0]
+    rgb, lum, tmp = scratch.rgb[:, :rows], scratch.lum[:rows], scratch.tmp[:rows]
+    np.copyto(rgb, tile[:, :, :3].transpose(2, 0, 1), casting='unsafe')
+    r, g, b = rgb
+
+    # Color shift: luminance, then blend each channel towards its silver tint
+    np.multiply(r, 0.299, out=lum)
+    np.multiply(g, 0.587, out=tmp)
+    lum += tmp
+    np.multiply(b, 0.114, out=tmp)
+    lum += tmp
+    keep = 1 - strength
+    np.multiply(lum, 0.92, out=tmp)
+    tmp *= strength
+    r *= keep
+    r += tmp
+    np.multiply(lum, 1.08, out=tmp)  # G and B both take the blue-tinted silver
+    tmp *= strength
+    g *= keep
+    g += tmp
+    b *= keep
+    b += tmp
+    np.clip(rgb, 0, 255, out=rgb)
+    shifted = scratch.shifted[:, :rows]
+    np.copyto(shifted, rgb, casting='unsafe')  # Truncates like astype(np.uint8)
+
+    # Silver gradient rows for this tile
+    y_ratio = np.arange(y0, y0 + rows)[:, np.newaxis] / height
+    base_value = 240 - (y_ratio * 80)
+    wave, gradient = scratch.wave[:rows], scratch.gradient[:, :rows]
+    for plane, offset in zip(gradient, x_wave):
+        np.add(base_value, offset, out=wave)
+        np.clip(wave, 140, 255, out=wave)
+        np.copyto(plane, wave, casting='unsafe')
+
+    # Overlay blend through the lookup table
+    index, out = scratch.index[:rows], scratch.out[:rows]
+    for channel, plane in enumerate((gradient[0], gradient[0], gradient[1])):
+        np.copyto(index, shifted[channel])
+        index <<= 8
+        index |= plane
+        np.take(lut, index, out=out)
+        tile[:, :, channel] = out
+    np.take(alpha, tile[:, :, 3], out=out[:, :])
+    tile[:, :, 3] = out
+
+
+def silver_image(image, strength=0.75, opacity=0.6, tile_pixels=TILE_PIXELS):
+    """Apply the silver effect to an RGBA image in place, one band of rows at a time"""
+    width, height = image.size
+    rows = max(1, min(height, tile_pixels // max(1, width)))
+    x_axis = np.arange(width)[np.newaxis, :]
+    x_wave = np.sin(x_axis / 40) * 20
+    x_wave = (x_wave, x_wave * 1.1)  # R/G and B offsets, as in create_silver_gradient
+    lut, alpha = overlay_lut(opacity), alpha_lut()
+    scratch = TileScratch(rows, width)
+    for y0 in range(0, height, rows):
+        box = (0, y0, width, min(height, y0 + rows))
+        tile = np.array(image.crop(box))
+        silver_tile(tile, y0, height, x_wave, strength, lut, alpha, scratch)
+        image.paste(Image.fromarray(tile, 'RGBA'), box[:2])
+    return image
+
+
+# ===== BATCH COMMAND =====
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _reset_peak_rss():
+    """Reset this process's peak RSS counter (Linux); False if unsupported"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _rss_kb(field):
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # Peak only, never reset
+
+
+def measure(fn, *args):
+    """(result, seconds, peak RSS above the starting RSS in MB) of one call"""
+    _reset_peak_rss()
+    before = _rss_kb('VmRSS')
+    start = time.perf_counter()
+    result = fn(*args)
+    seconds = time.perf_counter() - start
+    return result, seconds, max(0, _rss_kb('VmHWM') - before) / 1024
+
+
+def process_file(src, dst, strength, opacity, tile_pixels, recorded=None, force=False):
+    """Worker: silver one file unless its recorded input key and output hash still match"""
+    key = hashlib.sha256(
+        f"{PIPELINE_VERSION}:{strength}:{opacity}:{_file_sha256(src)}".encode()
+    ).hexdigest()
+    if (not force and recorded and recorded.get('key') == key and os.path.exists(dst)
+            and _file_sha256(dst) == recorded.get('output_sha256')):
+        return {'src': src, 'dst': dst, 'status': 'skipped', 'key': key, 'output_sha256': recorded['output_sha256']}
+
+    def run():
+        with Image.open(src) as opened:
+            image = opened.convert('RGBA')
+        start = time.perf_counter()
+        silver_image(image, strength, opacity, tile_pixels)
+        effect_seconds = time.perf_counter() - start
+        os.makedirs(os.path.dirname(dst) or '.', exist_ok=True)
+        image.save(dst, 'PNG', optimize=True)
+        return image.size, effect_seconds
+
+    ((width, height), effect_seconds), seconds, peak_mb = measure(run)
+    return {
+        'src': src, 'dst': dst, 'status': 'processed', 'key': key, 'output_sha256': _file_sha256(dst),
+        'megapixels': width * height / 1e6, 'effect_seconds': effect_seconds, 'seconds': seconds,
+        'peak_mb': peak_mb
+    }
+
+
+def collect_inputs(paths, output_dir):
+    """(source, destination) pairs; directories are walked for images, skipping earlier outputs"""
+    output_root = Path(output_dir).resolve()
+
+    def is_output(p):
+        return p.name == MANIFEST_NAME or output_root in p.resolve().parents
+
+    pairs = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files = sorted(p for p in path.rglob('*') if p.suffix.lower() in IMAGE_SUFFIXES and not is_output(p))
+            pairs += [(p, Path(output_dir) / p.relative_to(path).with_suffix('.png')) for p in files]
+        else:
+            pairs.append((path, Path(output_dir) / path.with_suffix('.png').name))
+
+    # Two sources writing one output (a.png + a.jpg, or same-named files from two
+    # directories) would race in the pool and share a manifest entry
+    sources = {}
+    unique = []
+    for src, dst in pairs:
+        src_key, dst_key = src.resolve(), dst.resolve()
+        if dst_key not in sources:
+            sources[dst_key] = [src_key]
+            unique.append((src, dst))
+        elif src_key not in sources[dst_key]:
+            sources[dst_key].append(src_key)
+    clashes = {dst: srcs for dst, srcs in sources.items() if len(srcs) > 1}
+    if clashes:
+        lines = [f"  {dst} <- {', '.join(map(str, srcs))}" for dst, srcs in clashes.items()]
+        raise SystemExit('Several inputs map to the same output; rename them or process them separately:\n'
+                         + '\n'.join(lines))
+    return [(str(src), str(dst)) for src, dst in unique]
+
+
+def reference_silver(path, strength, opacity):
+    """The original whole-image path: color shift, full-size gradient, overlay"""
+    base_image = Image.open(path).convert('RGBA')
+    result = color_shift_to_silver(base_image, strength=strength)
+    silver_gradient = create_silver_gradient(*base_image.size)
+    return overlay_blend_mode(result, silver_gradient, opacity=opacity)
+
+
+def compare_reference(path, strength, opacity, tile_pixels):
+    """Time / peak memory of the reference and tiled paths on one image, and check they agree"""
+    def tiled():
+        with Image.open(path) as opened:
+            image = opened.convert('RGBA')
+        return silver_image(image, strength, opacity, tile_pixels)
+
+    megapixels = None
+    outputs = {}
+    print(f"{'path':<10} {'s/MP':>8} {'peak MB':>8}")
+    for name, fn in (('reference', lambda: reference_silver(path, strength, opacity)), ('tiled', tiled)):
+        outputs[name], seconds, peak_mb = measure(fn)
+        megapixels = outputs[name].size[0] * outputs[name].size[1] / 1e6
+        print(f"{name:<10} {seconds / megapixels:>8.3f} {peak_mb:>8.1f}")
+    diff = np.abs(np.asarray(outputs['reference'], dtype=np.int16) - np.asarray(outputs['tiled'], dtype=np.int16))
+    print(f"{megapixels:.2f} MP, max channel difference: {diff.max()}")
+
+
 def main():
-    input_path = './assets/rectangle-vintage-gold-frame-horizontal-border-oriental-style-png.png'
-    output_path = './assets/rectangle-vintage-gold-frame-horizontal-border-oriental-style-png.png'
-    
-    print(f"Loading image from {input_path}...")
-    base_image = Image.open(input_path).convert('RGBA')
-    
-    width, height = base_image.size
-    print(f"Image size: {width} x {height}")
-    
-    # Method 1: Direct color shift (most effective for silver effect)
-    print("Applying direct color shift to silver (strength: 0.75)...")
-    result = color_shift_to_silver(base_image, strength=0.75)
-    
-    # Method 2: Also apply silver gradient overlay for extra metallic effect
-    print("Adding silver gradient overlay (opacity: 0.6)...")
-    silver_gradient = create_silver_gradient(width, height)
-    result = overlay_blend_mode(result, silver_gradient, opacity=0.6)
-    
-    # Save the result
-    print(f"Saving result to {output_path}...")
-    result.save(output_path, 'PNG', optimize=True)
-    print("\n✅ Done! Silver effect applied successfully.")
-    print("\n📝 Note: If you don't see changes in your browser:")
-    print("   1. Hard refresh the page (Ctrl+Shift+R or Cmd+Shift+R)")
-    print("   2. Clear browser cache")
-    print("   3. Check the image file directly in an image viewer")
-    print("\n🔧 To adjust the effect strength, modify:")
-    print("   - color_shift_to_silver strength (currently 0.75, range 0-1)")
-    print("   - overlay_blend_mode opacity (currently 0.6, range 0-1)")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='*', default=[FRAME_PATH], help='image files or directories')
+    parser.add_argument('-o', '--output-dir', default='./assets/silver')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--strength', type=float, default=0.75, help='color shift strength (0-1)')
+    parser.add_argument('--opacity', type=float, default=0.6, help='gradient overlay opacity (0-1)')
+    parser.add_argument('--tile-pixels', type=int, default=TILE_PIXELS)
+    parser.add_argument('--force', action='store_true', help='reprocess even when unchanged')
+    parser.add_argument('--compare-reference', action='store_true',
+                        help='benchmark against the whole-image functions on the first input and exit')
+    args = parser.parse_args()
+
+    pairs = collect_inputs(args.inputs, args.output_dir)
+    if not pairs:
+        raise SystemExit('No images found')
+    if args.compare_reference:
+        compare_reference(pairs[0][0], args.strength, args.opacity, args.tile_pixels)
+        return
+
+    manifest_path = Path(args.output_dir) / MANIFEST_NAME
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    print(f"Silvering {len(pairs)} images with {args.workers} workers "
+          f"(strength {args.strength}, opacity {args.opacity})...")
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(process_file, src, dst, args.strength, args.opacity, args.tile_pixels,
+                        manifest.get(os.path.relpath(dst, args.output_dir)), args.force)
+            for src, dst in pairs
+        ]
+        for future in futures:
+            result = future.result()
+            results.append(result)
+            manifest[os.path.relpath(result['dst'], args.output_dir)] = {
+                'key': result['key'], 'output_sha256': result['output_sha256']
+            }
+            if result['status'] == 'processed':
+                mp = result['megapixels']
+                print(f"  ✅ {result['dst']}: {mp:.2f} MP, effect {result['effect_seconds'] / mp:.3f} s/MP, "
+                      f"with decode/encode {result['seconds'] / mp:.3f} s/MP, peak {result['peak_mb']:.1f} MB")
+            else:
+                print(f"  ⏭️  {result['dst']}: unchanged")
+    elapsed = time.perf_counter() - start
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+
+    processed = [r for r in results if r['status'] == 'processed']
+    megapixels = sum(r['megapixels'] for r in processed)
+    print(f"\n✅ Done: {len(processed)} processed, {len(results) - len(processed)} unchanged in {elapsed:.2f}s")
+    if processed:
+        print(f"   {megapixels:.2f} MP: effect {sum(r['effect_seconds'] for r in processed) / megapixels:.3f} s/MP, "
+              f"with decode/encode {sum(r['seconds'] for r in processed) / megapixels:.3f} s/MP per worker, "
+              f"{elapsed / megapixels:.3f} s/MP wall clock, peak {max(r['peak_mb'] for r in processed):.1f} MB per image")
+    print("\n🔧 To adjust the effect strength, pass:")
+    print("   --strength (color shift, default 0.75, range 0-1)")
+    print("   --opacity  (gradient overlay, default 0.6, range 0-1)")
 
 if __name__ == '__main__':
     main()
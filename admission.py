@@ -0,0 +1,99 @@
+"""
+Admission Control
+Sits in front of the inference queues: prioritises direct user replies over
+continuation turns, caps in-flight work per session, and when queueing delay
+exceeds the SLO sheds or shortens continuation turns and routes agents to a
+smaller loaded model until the backlog clears
+"""
+
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, List
+
+from swarm import InferencePool
+
+USER = 'user'                  # Reply to a live user message
+CONTINUATION = 'continuation'  # Agent-to-agent follow-up / auto-conversation turn
+
+ADMIT = 'admit'
+SHORTEN = 'shorten'
+SHED = 'shed'
+
+
+class AdmissionController:
+    """Admission decisions and latency-aware model degradation, with counters"""
+
+    def __init__(
+        self,
+        pool: InferencePool,
+        available_fn: Callable[[], Iterable[str]],
+        slo_seconds: float = 4.0,
+        max_inflight_per_session: int = 2,
+        degrade_order: List[str] = None
+    ):
+        self.pool = pool
+        self._available_fn = available_fn
+        self.slo_seconds = slo_seconds
+        self.max_inflight_per_session = max_inflight_per_session
+        # Largest to smallest; an overloaded model hands off to the next loaded one
+        self.degrade_order = degrade_order or ['medium', 'tiny', 'small']
+        self._lock = threading.Lock()
+        self.inflight: Dict[str, int] = {}
+        self.counters = Counter()
+
+    def queue_latency(self) -> float:
+        """Worst queueing delay a turn would see, after overloaded models are routed around"""
+        return max((self.pool.wait_seconds(self._target(key)) for key in list(self.pool.queues)), default=0.0)
+
+    def admit(self, session: str, kind: str) -> str:
+        """ADMIT, SHORTEN (continuation under pressure) or SHED; call release() after non-SHED"""
+        latency = self.queue_latency()
+        with self._lock:
+            if self.inflight.get(session, 0) >= self.max_inflight_per_session:
+                self.counters[f'shed_{kind}_session_cap'] += 1
+                return SHED
+            decision = ADMIT
+            if kind == CONTINUATION and latency > 2 * self.slo_seconds:
+                self.counters['shed_continuation_slo'] += 1
+                return SHED
+            if kind == CONTINUATION and latency > self.slo_seconds:
+                self.counters['shortened_continuation'] += 1
+                decision = SHORTEN
+            self.inflight[session] = self.inflight.get(session, 0) + 1
+            self.counters[f'admitted_{kind}'] += 1
+            return decision
+
+    def release(self, session: str):
+        with self._lock:
+            remaining = self.inflight.get(session, 0) - 1
+            if remaining > 0:
+                self.inflight[session] = remaining
+            else:
+                self.inflight.pop(session, None)
+
+    def _target(self, model_key: str) -> str:
+        """The assigned model, or a smaller loaded one while it is over the SLO"""
+        if model_key not in self.degrade_order or self.pool.wait_seconds(model_key) <= self.slo_seconds:
+            return model_key
+        available = set(self._available_fn())
+        for smaller in self.degrade_order[self.degrade_order.index(model_key) + 1:]:
+            if smaller in available and self.pool.wait_seconds(smaller) <= self.slo_seconds:
+                return smaller
+        return model_key
+
+    def route(self, model_key: str) -> str:
+        """Model a turn assigned to model_key should use; degradations are counted"""
+        target = self._target(model_key)
+        if target != model_key:
+            with self._lock:
+                self.counters[f'degraded_{model_key}_to_{target}'] += 1
+        return target
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'slo_seconds': self.slo_seconds,
+                'queue_latency_seconds': round(self.queue_latency(), 3),
+                'inflight_sessions': len(self.inflight),
+                'counters': dict(self.counters)
+            }
@@ -0,0 +1,320 @@
+"""
+Asyncio Server Backend
+Serves the same HTTP routes and Socket.IO events as server.py from a
+python-socketio AsyncServer on an ASGI app, so idle connections and the
+long agent-to-agent conversation loops cost coroutines instead of OS threads.
+Replies are awaited on the event loop straight from the shared model queues;
+only retrieval and prompt building run on the inference executor, and document
+uploads have their own executor.
+
+Run with:  python3 async_server.py [--no-models]   (requires uvicorn)
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import socketio
+
+import server
+from admission import USER, CONTINUATION, SHED, SHORTEN
+from journal import ConversationJournal
+from server import conversation_manager, knowledge_base, model_manager
+
+# Blocking turn setup (retrieval, prompt building) runs here, off the event loop
+inference_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('INFERENCE_WORKERS', 4)),
+    thread_name_prefix='inference'
+)
+# Document uploads / deletes embed every chunk; kept apart so they never delay turns
+upload_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('UPLOAD_WORKERS', 2)),
+    thread_name_prefix='upload'
+)
+
+sio = socketio.AsyncServer(
+    async_mode='asgi',
+    cors_allowed_origins='*',
+    logger=True,
+    engineio_logger=True,
+    ping_timeout=10,
+    ping_interval=5
+)
+
+
+async def run_blocking(fn, *args, executor=inference_executor):
+    """Run a blocking call on an executor (the inference executor by default)"""
+    return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
+async def generate_responses(prompt, sender, kind, shorten):
+    """ConversationManager.generate_responses, awaiting the model queues on the event loop
+
+    A turn only holds an executor thread for retrieval and prompt building, so any
+    number of turns can wait on the shared priority queues at once.
+    """
+    turn = await run_blocking(conversation_manager.start_turn, prompt, sender, kind, shorten)
+    if conversation_manager.swarm_mode:
+        # Fan out onto the shared model queues, then collect in selection order
+        submitted = await run_blocking(
+            lambda: [conversation_manager.submit_reply(turn, agent, seed) for agent, seed in turn.speakers]
+        )
+    else:
+        # One at a time, so each agent hears the replies before its own
+        submitted = [None] * len(turn.speakers)
+
+    for (agent, seed), pending in zip(turn.speakers, submitted):
+        try:
+            pending = pending or await run_blocking(conversation_manager.submit_reply, turn, agent, seed)
+            with contextlib.suppress(Exception):  # finish_reply reports generation errors
+                await asyncio.wrap_future(pending[1])
+            conversation_manager.finish_reply(turn, agent, seed, pending)
+        except Exception:
+            print(f'❌ Failed to generate response from {agent.name}')
+            import traceback
+            traceback.print_exc()
+    return conversation_manager.end_turn(turn)
+
+
+async def admitted_responses(prompt, sender, session, kind):
+    """generate_responses behind admission control; None when the turn is shed"""
+    decision = server.admission.admit(session, kind)
+    if decision == SHED:
+        print(f'🚦 Shed {kind} turn for session {session}')
+        return None
+    try:
+        return await generate_responses(prompt, sender, kind, decision == SHORTEN)
+    finally:
+        server.admission.release(session)
+
+
+# ===== HTTP ROUTES =====
+CORS_HEADERS = [
+    (b'access-control-allow-origin', b'*'),
+    (b'access-control-allow-headers', b'*'),
+    (b'access-control-allow-methods', b'GET, POST, OPTIONS'),
+]
+
+
+async def send_response(send, body, status=200, content_type=b'application/json'):
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode() if content_type == b'application/json' else body.encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type), (b'content-length', str(len(body)).encode())] + CORS_HEADERS
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def read_json(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    try:
+        return json.loads(b''.join(chunks) or b'{}')
+    except ValueError:
+        return {}
+
+
+async def index(receive):
+    return "Swarms WebSocket Server Running", 200
+
+
+async def health(receive):
+    return server.health_payload(), 200
+
+
+async def upload_document(receive):
+    """Upload a document to the knowledge base"""
+    data = await read_json(receive)
+    return await run_blocking(server.upload_document_payload, data, executor=upload_executor)
+
+
+async def delete_document(receive):
+    """Delete a single document from the knowledge base"""
+    data = await read_json(receive)
+    return await run_blocking(server.delete_document_payload, data, executor=upload_executor)
+
+
+async def knowledge_status(receive):
+    return server.knowledge_status_payload(), 200
+
+
+async def swarm_status(receive):
+    return server.swarm_status_payload(), 200
+
+
+async def model_stats(receive):
+    return server.model_stats_payload(), 200
+
+
+async def admission_status(receive):
+    return server.admission_status_payload(), 200
+
+
+async def clear_knowledge(receive):
+    conversation_manager.record_event('clear_knowledge')
+    knowledge_base.clear()
+    return {'success': True, 'message': 'Knowledge base cleared'}, 200
+
+
+ROUTES = {
+    ('GET', '/'): index,
+    ('GET', '/health'): health,
+    ('POST', '/upload_document'): upload_document,
+    ('POST', '/delete_document'): delete_document,
+    ('GET', '/knowledge_status'): knowledge_status,
+    ('GET', '/swarm_status'): swarm_status,
+    ('GET', '/model_stats'): model_stats,
+    ('GET', '/admission_status'): admission_status,
+    ('POST', '/clear_knowledge'): clear_knowledge,
+}
+
+
+async def http_app(scope, receive, send):
+    """Plain HTTP routes (everything that isn't /socket.io/)"""
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Bound and serving: load models in the background
+                asyncio.get_running_loop().run_in_executor(None, server.load_models)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                inference_executor.shutdown(wait=False)
+                upload_executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    if scope['type'] != 'http':
+        return
+
+    if scope['method'] == 'OPTIONS':
+        await send_response(send, b'', 204)
+        return
+    handler = ROUTES.get((scope['method'], scope['path']))
+    if handler is None:
+        await send_response(send, {'error': 'Not found'}, 404)
+        return
+    body, status = await handler(receive)
+    content_type = b'text/plain; charset=utf-8' if isinstance(body, str) else b'application/json'
+    await send_response(send, body, status, content_type)
+
+
+app = socketio.ASGIApp(sio, other_asgi_app=http_app)
+
+
+# ===== SOCKET HANDLERS =====
+@sio.event
+async def connect(sid, environ):
+    print(f'🔌 Client connected: {sid}')
+    await sio.emit('connection_response', {'status': 'connected', 'sid': sid}, to=sid)
+
+
+@sio.event
+async def disconnect(sid, *args):
+    print(f'🔌 Client disconnected: {sid}')
+
+
+@sio.on('register_agents')
+async def handle_register_agents(sid, data):
+    """Register agents with their personalities"""
+    agents_data = data.get('agents', {})
+    conversation_manager.register_agents(agents_data)
+    await sio.emit('agents_registered', {'count': len(conversation_manager.agents)})
+
+
+@sio.on('update_simulation_settings')
+async def handle_simulation_settings(sid, data):
+    """Update conversation mode and topic"""
+    mode = data.get('mode', 'turn-by-turn')
+    topic = data.get('topic', 'General Discussion')
+    conversation_manager.update_settings(mode, topic, data.get('sources'))
+
+
+@sio.on('user_message')
+async def handle_user_message(sid, data):
+    """Handle message from user and trigger agent-to-agent conversation"""
+    user_name = data.get('username', 'User')
+    message = data.get('message', '')
+    print(f'📥 User message from {user_name}: {message}')
+
+    # Add user message to all agent memories
+    conversation_manager.add_message_to_all_memories(user_name, message)
+
+    # Generate initial responses from selected agents
+    responses = await admitted_responses(message, user_name, sid, USER)
+    if responses is None:
+        await sio.emit('error', {'message': 'Too many requests in flight - try again shortly'}, to=sid)
+        return
+    for response in responses:
+        await sio.emit('new_message', response)
+
+    # Continue conversation: LONG, FLUID, NATURAL FLOW
+    num_turns = server.continuation_turns(conversation_manager.conversation_mode)
+    print(f'🔄 Continuing conversation for {num_turns} turns...')
+
+    for turn in range(num_turns):
+        # Fast-paced conversation - short pauses like real chat
+        await asyncio.sleep(random.uniform(0.8, 2.0))
+
+        # Get the last agent's message as the prompt for next response
+        if conversation_manager.global_history:
+            last_message = conversation_manager.global_history[-1]
+            responses = await admitted_responses(last_message['content'], last_message['speaker'], sid, CONTINUATION)
+            if responses is None:
+                break
+            for response in responses:
+                await sio.emit('new_message', response)
+
+                # If multiple responses, tiny pause between them
+                if len(responses) > 1:
+                    await asyncio.sleep(0.3)
+
+
+@sio.on('start_auto_conversation')
+async def handle_auto_conversation(sid, data):
+    """Start autonomous conversation between agents"""
+    if not conversation_manager.agents:
+        await sio.emit('error', {'message': 'No agents registered'}, to=sid)
+        return
+
+    # Generate initial prompt based on topic
+    initial_prompt = f"Let's discuss: {conversation_manager.conversation_topic}. Share your initial perspective."
+    print(f'🎬 Starting auto-conversation on topic: {conversation_manager.conversation_topic}')
+    conversation_manager.add_message_to_all_memories('System', initial_prompt)
+
+    responses = await admitted_responses(initial_prompt, 'System', sid, CONTINUATION)
+    if responses is None:
+        await sio.emit('error', {'message': 'Server is busy - try again shortly'}, to=sid)
+        return
+    for response in responses:
+        await sio.emit('new_message', response)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Swarms WebSocket Server (asyncio backend)')
+    parser.add_argument('--no-models', action='store_true',
+                        help='Fast boot: serve stub responses without loading any models')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--journal', metavar='PATH',
+                        help='Append every conversation event to this JSONL journal (see replay.py)')
+    args = parser.parse_args()
+    if args.no_models:
+        model_manager.enable_stub_mode()
+        server.model_status['state'] = 'stub'
+    if args.journal:
+        conversation_manager.attach_journal(ConversationJournal(args.journal))
+
+    import uvicorn
+    print('🚀 Starting Swarms WebSocket Server (asyncio) with Local LLMs...')
+    print(f'📡 Server running on http://localhost:{args.port}')
+    print(f'📡 WebSocket endpoint: ws://localhost:{args.port}/socket.io/')
+    uvicorn.run(app, host='0.0.0.0', port=args.port, log_level='warning')
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Admission control benchmark
+Many sessions run continuation loops against stub models while users keep
+sending messages; reports user-reply latency and admission counters with the
+controller on and effectively off
+"""
+
+import argparse
+import contextlib
+import io
+import threading
+import time
+
+import server
+from admission import AdmissionController, USER, CONTINUATION
+from local_models import model_manager
+
+# Simulated per-call latency (seconds) for each model size
+STUB_LATENCY = {'tiny': 0.01, 'small': 0.015, 'medium': 0.04}
+
+
+def stub_generate(prompt, system_prompt="", model_key='tiny', max_tokens=50, temperature=0.7, **kwargs):
+    time.sleep(STUB_LATENCY.get(model_key, 0.01) * max_tokens / 50)
+    return f"{model_key} says something brief."
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def run(sessions, seconds, slo, cap):
+    server.admission = AdmissionController(server.inference_pool, server.available_models,
+                                           slo_seconds=slo, max_inflight_per_session=cap)
+    manager = server.conversation_manager = server.ConversationManager()
+    manager.update_settings('aggressive', 'Benchmark')
+    manager.register_agents({str(i): {'name': name, 'personality': []}
+                             for i, name in enumerate(server.PERSONALITY_ARCHETYPES)})
+    manager.add_message_to_all_memories('User', 'Kick things off.')
+
+    deadline = time.perf_counter() + seconds
+    user_latency, continuation_turns = [], [0]
+
+    def continuation_loop(session):
+        while time.perf_counter() < deadline:
+            last = manager.global_history[-1]
+            if server.admitted_responses(last['content'], last['speaker'], session, CONTINUATION) is None:
+                time.sleep(0.05)  # Shed: back off like a client would
+            else:
+                continuation_turns[0] += 1
+
+    def user_loop(session):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            if server.admitted_responses('What do you all think?', 'User', session, USER) is not None:
+                user_latency.append(time.perf_counter() - start)
+            time.sleep(0.2)
+
+    threads = [threading.Thread(target=continuation_loop, args=(f'bot-{i}',)) for i in range(sessions)]
+    threads += [threading.Thread(target=user_loop, args=(f'user-{i}',)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return user_latency, continuation_turns[0], server.admission.stats()['counters']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sessions', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--slo', type=float, default=0.5)
+    args = parser.parse_args()
+
+    model_manager.enable_stub_mode()
+    model_manager.generate = stub_generate
+    server.model_status['state'] = 'stub'
+
+    for label, slo, cap in [('off', 1e9, 10 ** 6), ('on', args.slo, 2)]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            latency, turns, counters = run(args.sessions, args.seconds, slo, cap)
+        print(f"admission {label:>3}: user replies {len(latency):4d}  "
+              f"p50 {percentile(latency, 0.5):6.2f}s  p95 {percentile(latency, 0.95):6.2f}s  "
+              f"continuation turns {turns}")
+        print(f"  counters: {counters}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Ingest deduplication benchmark
+Uploads a synthetic corpus with re-uploaded and lightly edited copies into a
+KnowledgeBase with and without deduplication, and reports chunks indexed,
+embedding calls, index size, ingest time and duplicate retrieval results.
+Embeddings come from a cheap stand-in (hash-seeded random vectors) so the
+benchmark runs without model weights.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import time
+
+os.environ.setdefault('SWARMS_NO_MODELS', '1')
+
+import numpy as np
+
+import server
+from dedup import Deduplicator
+from local_models import model_manager
+
+VOCAB = [f"{a}{b}" for a in ('ka', 'lo', 'mi', 'ne', 'ru', 'so', 'ta', 'vi') for b in range(60)]
+
+
+def make_uploads(num_docs, words, reupload, edited, seed=3):
+    rng = random.Random(seed)
+    originals = [' '.join(rng.choice(VOCAB) for _ in range(words)) for _ in range(num_docs)]
+    uploads = [(f'doc-{i}', text) for i, text in enumerate(originals)]
+    for i in rng.sample(range(num_docs), int(reupload * num_docs)):
+        uploads.append((f'doc-{i}-again', originals[i]))
+    for i in rng.sample(range(num_docs), int(edited * num_docs)):
+        tokens = originals[i].split()
+        for _ in range(max(1, len(tokens) // 100)):  # ~1% of words changed
+            tokens[rng.randrange(len(tokens))] = rng.choice(VOCAB)
+        uploads.append((f'doc-{i}-v2', ' '.join(tokens)))
+    rng.shuffle(uploads)
+    return uploads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--docs', type=int, default=300)
+    parser.add_argument('--words', type=int, default=600)
+    parser.add_argument('--reupload', type=float, default=0.3, help='fraction of docs uploaded twice')
+    parser.add_argument('--edited', type=float, default=0.3, help='fraction of docs re-uploaded with small edits')
+    parser.add_argument('--dim', type=int, default=2048)
+    args = parser.parse_args()
+
+    calls = {'embed': 0}
+    def stand_in_embedding(text, model_key='tiny'):
+        calls['embed'] += 1
+        rng = np.random.default_rng(abs(hash(text)) % 2**32)
+        return rng.standard_normal(args.dim).astype(np.float32)
+    model_manager.get_embedding = stand_in_embedding
+
+    uploads = make_uploads(args.docs, args.words, args.reupload, args.edited)
+    queries = [' '.join(text.split()[50:56]) for _, text in uploads[:100]]
+    probe = Deduplicator(server.DEDUP_THRESHOLD)
+
+    print(f"{len(uploads)} uploads ({args.docs} originals, {args.reupload:.0%} re-uploaded, {args.edited:.0%} edited)")
+    print(f"{'dedup':<6} {'chunks':>7} {'embeds':>7} {'vectors MB':>11} {'postings':>9} {'ingest s':>9} {'dup results':>12}")
+    for dedup in (False, True):
+        kb = server.KnowledgeBase(dedup=dedup)
+        calls['embed'] = 0
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # Knowledge base logs every upload
+            for filename, text in uploads:
+                kb.add_document(text, filename)
+        ingest = time.perf_counter() - start
+        embeds = calls['embed']
+
+        postings = sum(len(ids) for ids, _ in kb.lexical.postings.values())
+        duplicates = 0
+        for query in queries:
+            results = kb.retrieve(query, top_k=3)
+            sigs = [probe.signature(doc['text']) for doc in results]
+            duplicates += sum(probe.similarity(a, b) >= probe.threshold
+                              for i, a in enumerate(sigs) for b in sigs[i + 1:])
+        print(f"{'on' if dedup else 'off':<6} {len(kb.documents):>7} {embeds:>7} "
+              f"{kb.vectors.nbytes / 2**20:>11.1f} {postings:>9} {ingest:>9.2f} {duplicates:>12}")
+
+
+if __name__ == '__main__':
+    main()
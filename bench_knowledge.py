@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Knowledge base maintenance benchmark
+Builds a multi-document KnowledgeBase, then measures /knowledge_status cost,
+replacing one document (embedding calls and time, against clearing and
+re-uploading everything), scoped versus unscoped retrieval, and compaction.
+Embeddings come from a cheap stand-in (hash-seeded random vectors) so the
+benchmark runs without model weights.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import time
+
+os.environ.setdefault('SWARMS_NO_MODELS', '1')
+
+import numpy as np
+
+import server
+from local_models import model_manager
+
+VOCAB = [f"{a}{b}" for a in ('ka', 'lo', 'mi', 'ne', 'ru', 'so', 'ta', 'vi') for b in range(60)]
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--docs', type=int, default=200)
+    parser.add_argument('--words', type=int, default=800)
+    parser.add_argument('--dim', type=int, default=2048)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    calls = {'embed': 0}
+    def stand_in_embedding(text, model_key='tiny'):
+        calls['embed'] += 1
+        rng = np.random.default_rng(abs(hash(text)) % 2**32)
+        return rng.standard_normal(args.dim).astype(np.float32)
+    model_manager.get_embedding = stand_in_embedding
+
+    rng = random.Random(5)
+    corpus = {f'doc-{i}': ' '.join(rng.choice(VOCAB) for _ in range(args.words)) for i in range(args.docs)}
+    queries = [' '.join(rng.choice(VOCAB) for _ in range(4)) for _ in range(args.queries)]
+    server.knowledge_base = kb = server.KnowledgeBase(compact_ratio=1.1)  # Compaction timed by hand below
+
+    with contextlib.redirect_stdout(io.StringIO()):  # Knowledge base logs every upload
+        ingest, _ = timed(lambda: [kb.add_document(text, name) for name, text in corpus.items()])
+        indexed = kb.chunk_count
+
+        old_status, _ = timed(lambda: {'total_chunks': len(kb.documents),
+                                       'sources': list(set([doc['source'] for doc in kb.documents]))}, 20)
+        new_status, _ = timed(server.knowledge_status_payload, 20)
+
+        target = 'doc-0'
+        edited = corpus[target].replace(corpus[target].split()[10], 'changed')
+        calls['embed'] = 0
+        replace, _ = timed(lambda: server.upload_document_payload({'text': edited, 'filename': target, 'replace': True}))
+        replace_embeds = calls['embed']
+
+        rebuild_kb = server.KnowledgeBase()
+        calls['embed'] = 0
+        corpus[target] = edited
+        rebuild, _ = timed(lambda: [rebuild_kb.add_document(text, name) for name, text in corpus.items()])
+        rebuild_embeds = calls['embed']
+
+        for name in list(corpus)[1:args.docs // 3]:
+            kb.remove_source(name)
+        dead_hits = sum(doc['source'] in corpus and doc['source'] not in kb.segments
+                        for q in queries for doc in kb.retrieve(q, top_k=3))
+
+        scope = ['doc-0', f'doc-{args.docs - 1}']
+        unscoped, _ = timed(lambda: [kb.retrieve(q, top_k=3) for q in queries])
+        scoped, results = timed(lambda: [kb.retrieve(q, top_k=3, sources=scope) for q in queries])
+        out_of_scope = sum(doc['source'] not in scope for docs in results for doc in docs)
+
+        before_mb, tombstones = kb.vectors.nbytes / 2**20, kb.tombstones
+        compact, _ = timed(kb.compact)
+        after_unscoped, _ = timed(lambda: [kb.retrieve(q, top_k=3) for q in queries])
+
+    print(f"{indexed} chunks from {len(corpus)} documents, ingest {ingest:.2f}s")
+    print(f"status:     set rebuild {old_status * 1e3:8.3f} ms   counters {new_status * 1e3:8.3f} ms")
+    print(f"replace:    one document {replace:6.2f}s / {replace_embeds} embeds   "
+          f"clear + re-upload {rebuild:6.2f}s / {rebuild_embeds} embeds")
+    print(f"deletes:    {tombstones} tombstoned chunks, {dead_hits} deleted chunks retrieved")
+    print(f"retrieval:  unscoped {unscoped / len(queries) * 1e3:6.2f} ms/query   "
+          f"scoped to {len(scope)} docs {scoped / len(queries) * 1e3:6.2f} ms/query ({out_of_scope} out of scope)")
+    print(f"compaction: {compact * 1e3:.1f} ms, vectors {before_mb:.1f} -> {kb.vectors.nbytes / 2**20:.1f} MB, "
+          f"unscoped retrieval after {after_unscoped / len(queries) * 1e3:6.2f} ms/query")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Retrieval benchmark
+Builds a synthetic QA corpus (one fact per document, buried in filler text) and
+reports ingest time, query latency, recall@k and MRR for the legacy character-code
+vectors, BM25 alone and (with --embed-model) embedding-only and hybrid retrieval
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+ATTRIBUTES = ['capital', 'founder', 'motto', 'currency', 'guardian', 'rival', 'emblem', 'river']
+FILLER = ('swarm orbit signal horizon daemon lattice ember quiet vector archive pulse mirror '
+          'harbor glyph cinder meadow circuit tide lantern echo').split()
+
+
+def make_corpus(num_docs, seed=7):
+    rng = random.Random(seed)
+    docs, queries = [], []
+    for i in range(num_docs):
+        entity = f"{rng.choice(['north', 'south', 'east', 'west'])}{rng.randrange(10**6):06d}"
+        attr = rng.choice(ATTRIBUTES)
+        value = ''.join(rng.choice('bcdfghklmnprstvz') + rng.choice('aeiou') for _ in range(3))
+        filler = lambda n: ' '.join(rng.choice(FILLER) for _ in range(n))
+        docs.append(f"{filler(30)}. The {attr} of {entity} is {value}. {filler(30)}.")
+        queries.append((f"What is the {attr} of {entity}?", i))
+    return docs, queries
+
+
+def legacy_embedding(text):
+    """The character-code fallback vector the knowledge base used before BM25"""
+    embedding = [float(ord(c)) / 1000.0 for c in text[:384]]
+    return embedding + [0.0] * (384 - len(embedding))
+
+
+def evaluate(search, queries, top_k):
+    hits, reciprocal_ranks, latencies = 0, [], []
+    for query, answer in queries:
+        start = time.perf_counter()
+        ranked = search(query)
+        latencies.append(time.perf_counter() - start)
+        rank = ranked.index(answer) + 1 if answer in ranked else None
+        hits += rank is not None and rank <= top_k
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+    return hits / len(queries), statistics.mean(reciprocal_ranks), 1000 * statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--docs', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--embed-model', help="model_configs key to embed with (e.g. tiny); default: no model")
+    args = parser.parse_args()
+
+    if not args.embed_model:
+        os.environ['SWARMS_NO_MODELS'] = '1'
+    import server
+    from local_models import model_manager
+    if args.embed_model and not model_manager.load_model(args.embed_model):
+        sys.exit(f"Could not load {args.embed_model}")
+
+    docs, queries = make_corpus(args.docs)
+    queries = random.Random(1).sample(queries, min(args.queries, len(queries)))
+    kb = server.KnowledgeBase()
+    kb.chunk_size = 10**6  # One chunk per synthetic document keeps ids aligned
+
+    start = time.perf_counter()
+    for i, doc in enumerate(docs):
+        kb.add_document(doc, filename=f"doc-{i}")
+    ingest = time.perf_counter() - start
+
+    results = {}
+    legacy = np.asarray([legacy_embedding(doc) for doc in docs], dtype=np.float32)
+    legacy /= np.linalg.norm(legacy, axis=1, keepdims=True)
+    def legacy_search(query):
+        q = np.asarray(legacy_embedding(query), dtype=np.float32)
+        return np.argsort(-(legacy @ (q / np.linalg.norm(q))))[:args.top_k].tolist()
+    results['legacy char-code'] = evaluate(legacy_search, queries, args.top_k)
+    results['bm25'] = evaluate(lambda q: [i for i, _ in kb.lexical.search(q, args.top_k)], queries, args.top_k)
+    if args.embed_model:
+        embed = lambda q: model_manager.get_embedding(q, model_key=args.embed_model)
+        results['vector'] = evaluate(lambda q: kb.vector_search(embed(q), args.top_k), queries, args.top_k)
+    ids = {id(doc): i for i, doc in enumerate(kb.documents)}
+    results['retrieve()'] = evaluate(lambda q: [ids[id(d)] for d in kb.retrieve(q, args.top_k)], queries, args.top_k)
+
+    print(f"\n{args.docs} docs ingested in {ingest:.2f}s ({1000 * ingest / args.docs:.2f} ms/doc), "
+          f"{len(queries)} queries, embeddings: {args.embed_model or 'none (BM25 fast path)'}")
+    print(f"{'method':<18} {'recall@' + str(args.top_k):>9} {'MRR':>6} {'p50 ms':>8}")
+    for name, (recall, mrr, p50) in results.items():
+        print(f"{name:<18} {recall:>9.3f} {mrr:>6.3f} {p50:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
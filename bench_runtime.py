@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Inference runtime benchmark
+Loads models with the runtime layer (thread budgets, optional torch.compile,
+warmup) and reports cold vs warm first-token latency per model, then the
+tokens/sec of concurrent generation with and without per-model thread budgets
+"""
+
+import argparse
+import os
+import threading
+import time
+
+from local_models import model_manager
+
+PROMPT = "Is free will compatible with a deterministic universe?"
+
+
+def concurrent_throughput(keys, rounds, max_tokens, budgets):
+    """Tokens/sec with one thread per model generating at the same time"""
+    tokens = {key: 0 for key in keys}
+
+    def worker(key):
+        if not budgets:
+            import torch
+            torch.get_num_threads()
+            torch.set_num_threads(os.cpu_count() or 1)  # Every model asks for every core
+        tokenizer = model_manager.tokenizers[key]
+        for _ in range(rounds):
+            text = model_manager.generate(PROMPT, "One sentence max.", model_key=key, max_tokens=max_tokens,
+                                          speculative=False)
+            tokens[key] += len(tokenizer.encode(text, add_special_tokens=False))
+
+    if not budgets:
+        model_manager._apply_runtime = lambda model_key: None
+    threads = [threading.Thread(target=worker, args=(key,)) for key in keys]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(tokens.values()) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--models', nargs='+', default=['tiny', 'small', 'medium'])
+    parser.add_argument('--name', action='append', default=[], metavar='KEY=CHECKPOINT',
+                        help='override a model checkpoint, e.g. tiny=/path/to/model')
+    parser.add_argument('--compile', action='store_true', help='enable torch.compile')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--max-tokens', type=int, default=32)
+    args = parser.parse_args()
+
+    for override in args.name:
+        key, name = override.split('=', 1)
+        model_manager.model_configs[key]['name'] = name
+    model_manager.compile_models = args.compile
+    for key in args.models:
+        model_manager.model_configs[key]['draft_model'] = None
+        if not model_manager.load_model(key):
+            raise SystemExit(f"Could not load {key}")
+
+    print(f"{'model':<8} {'threads':>7} {'compiled':>8} {'prompt':>7} {'cold ms':>9} {'warm ms':>9}")
+    for key, stats in model_manager.runtime_report().items():
+        for length, cold in stats.get('cold_first_token_ms', {}).items():
+            print(f"{key:<8} {str(stats['threads']):>7} {str(stats['compiled']):>8} {length:>7} "
+                  f"{cold:>9.1f} {stats['warm_first_token_ms'][length]:>9.1f}")
+
+    with_budgets = concurrent_throughput(args.models, args.rounds, args.max_tokens, budgets=True)
+    without = concurrent_throughput(args.models, args.rounds, args.max_tokens, budgets=False)
+    print(f"concurrent tokens/sec: thread budgets {with_budgets:.1f}, all cores per model {without:.1f}")
+
+
+if __name__ == '__main__':
+    main()
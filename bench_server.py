@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Server backend benchmark
+Starts server.py (Flask-SocketIO, threading) and async_server.py (asyncio/ASGI)
+in stub mode, connects many Socket.IO clients at once and reports connect time,
+HTTP latency under load, user-message round trip and server threads / RSS
+(requires python-socketio[asyncio_client] / aiohttp)
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import aiohttp
+import socketio
+
+BACKENDS = {
+    'threading': 'server.py',
+    'asyncio': 'async_server.py',
+}
+
+
+def proc_status(pid):
+    """(threads, rss MB) from /proc (Linux only)"""
+    fields = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            fields[key] = value.strip()
+    return int(fields['Threads']), int(fields['VmRSS'].split()[0]) / 1024
+
+
+async def wait_healthy(url, timeout=60):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(f'{url}/health') as resp:
+                    if resp.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f'{url} did not come up')
+
+
+async def connect_client(url):
+    client = socketio.AsyncClient()
+    first_message = asyncio.Event()
+    client.on('new_message', lambda data: first_message.set())
+    await client.connect(url, transports=['websocket'])
+    return client, first_message
+
+
+async def http_latency(url, requests):
+    async with aiohttp.ClientSession() as session:
+        async def one():
+            start = time.perf_counter()
+            async with session.get(f'{url}/knowledge_status') as resp:
+                await resp.read()
+            return time.perf_counter() - start
+        return await asyncio.gather(*(one() for _ in range(requests)))
+
+
+async def bench(backend, port, clients, senders):
+    url = f'http://127.0.0.1:{port}'
+    proc = subprocess.Popen(
+        [sys.executable, BACKENDS[backend], '--no-models', '--port', str(port)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        await wait_healthy(url)
+        start = time.perf_counter()
+        connected = await asyncio.gather(*(connect_client(url) for _ in range(clients)))
+        connect_time = time.perf_counter() - start
+
+        latencies = await http_latency(url, 200)
+        idle_threads, idle_rss = proc_status(proc.pid)
+
+        await connected[0][0].emit('register_agents', {'agents': {
+            str(i): {'name': name, 'personality': []}
+            for i, name in enumerate(['YOU', 'Osiris', 'Solomon', 'Azura', 'Simba', 'Harichi', 'Angel'])
+        }})
+        await asyncio.sleep(0.5)
+        start = time.perf_counter()
+        for client, _ in connected[:senders]:
+            await client.emit('user_message', {'username': 'Bench', 'message': 'What do you all think?'})
+        await asyncio.wait_for(asyncio.gather(*(event.wait() for _, event in connected)), 60)
+        first_reply = time.perf_counter() - start
+        await asyncio.sleep(2)  # Let the continuation loops get going
+        busy_threads, busy_rss = proc_status(proc.pid)
+
+        await asyncio.gather(*(client.disconnect() for client, _ in connected))
+        return {
+            'connect_s': connect_time,
+            'http_p50_ms': 1000 * statistics.median(latencies),
+            'first_reply_s': first_reply,
+            'threads_idle': idle_threads,
+            'threads_busy': busy_threads,
+            'rss_mb': busy_rss,
+        }
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, nargs='+', default=[50, 200])
+    parser.add_argument('--senders', type=int, default=10, help='clients that send a user message')
+    parser.add_argument('--port', type=int, default=5051)
+    args = parser.parse_args()
+
+    print(f"{'backend':<10} {'clients':>7} {'connect s':>9} {'http p50':>9} {'1st reply':>9} "
+          f"{'thr idle':>8} {'thr busy':>8} {'RSS MB':>7}")
+    for clients in args.clients:
+        for backend in BACKENDS:
+            r = asyncio.run(bench(backend, args.port, clients, min(args.senders, clients)))
+            print(f"{backend:<10} {clients:>7} {r['connect_s']:>9.2f} {r['http_p50_ms']:>8.1f}ms "
+                  f"{r['first_reply_s']:>8.2f}s {r['threads_idle']:>8} {r['threads_busy']:>8} {r['rss_mb']:>7.0f}")
+
+
+if __name__ == '__main__':
+    main()
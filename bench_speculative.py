@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Speculative decoding benchmark
+Generates the same prompts with and without the draft model and reports
+tokens/sec, speedup and draft acceptance rate
+"""
+
+import argparse
+import time
+
+from local_models import model_manager
+
+PROMPTS = [
+    "Is free will compatible with a deterministic universe?",
+    "What makes a swarm smarter than any single member?",
+    "Should machines be allowed to disagree with their makers?",
+    "Why do people trust confident speakers?",
+    "What is the strongest argument against your last point?",
+]
+
+
+def run(model_key, prompts, max_tokens, speculative):
+    tokenizer = model_manager.tokenizers[model_key]
+    tokens = 0
+    start = time.perf_counter()
+    for prompt in prompts:
+        text = model_manager.generate(
+            prompt, system_prompt="One sentence max. Be brief.", model_key=model_key,
+            max_tokens=max_tokens, speculative=speculative
+        )
+        tokens += len(tokenizer.encode(text, add_special_tokens=False))
+    return tokens / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--target', default='medium', help='model_configs key to speed up')
+    parser.add_argument('--draft', default='tiny', help='model_configs key used as the draft')
+    parser.add_argument('--target-name', help='override the target checkpoint')
+    parser.add_argument('--draft-name', help='override the draft checkpoint')
+    parser.add_argument('--max-tokens', type=int, default=40)
+    parser.add_argument('--rounds', type=int, default=2)
+    args = parser.parse_args()
+
+    if args.target_name:
+        model_manager.model_configs[args.target]['name'] = args.target_name
+    if args.draft_name:
+        model_manager.model_configs[args.draft]['name'] = args.draft_name
+    model_manager.model_configs[args.target]['draft_model'] = args.draft
+    for key in (args.target, args.draft):
+        if not model_manager.load_model(key):
+            raise SystemExit(f"Could not load {key}")
+
+    mode = model_manager.speculative_mode(args.target)
+    print(f"{args.draft} -> {args.target}: {mode or 'incompatible'}")
+    if not mode:
+        return
+
+    prompts = PROMPTS * args.rounds
+    run(args.target, prompts[:1], args.max_tokens, speculative=False)  # Warm up both paths
+    run(args.target, prompts[:1], args.max_tokens, speculative=True)
+    model_manager.speculative_stats.clear()
+
+    baseline = run(args.target, prompts, args.max_tokens, speculative=False)
+    assisted = run(args.target, prompts, args.max_tokens, speculative=True)
+    report = model_manager.speculative_report()[args.target]
+    print(f"baseline:    {baseline:.1f} tokens/sec")
+    print(f"speculative: {assisted:.1f} tokens/sec ({assisted / baseline:.2f}x)")
+    print(f"acceptance:  {report['acceptance_rate']:.1%} of drafted tokens")
+
+
+if __name__ == '__main__':
+    main()
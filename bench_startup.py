@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark
+Runs `python -X importtime -c "import server"` in a fresh interpreter and reports
+total import time plus the slowest top-level imports
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+
+def import_profile(module, env):
+    """Return (total_us, [(cumulative_us, name), ...] for the module's direct imports, all names)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2  # Two spaces per level
+        rows.append((depth, int(cumulative), name.strip()))
+
+    # importtime prints children before their parent, so the module's direct
+    # imports are the depth-1 rows since the previous top-level row
+    target = max(i for i, row in enumerate(rows) if row[0] == 0 and row[2] == module)
+    first = max((i for i, row in enumerate(rows[:target]) if row[0] == 0), default=-1) + 1
+    children = [(c, name) for depth, c, name in rows[first:target] if depth == 1]
+    return rows[target][1], sorted(children, reverse=True), {name for _, _, name in rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--module', default='server')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    env = dict(os.environ, SWARMS_NO_MODELS='1')
+    runs = [import_profile(args.module, env) for _ in range(args.runs)]
+    best_total, children, names = min(runs, key=lambda r: r[0])
+
+    print(f"import {args.module}: {best_total / 1000:.1f} ms (best of {args.runs})")
+    for cumulative, name in children[:args.top]:
+        print(f"  {cumulative / 1000:>8.1f} ms  {name}")
+    heavy = sorted(name for name in names if name in ('torch', 'transformers', 'sklearn'))
+    print(f"heavy imports at startup: {', '.join(heavy) if heavy else 'none'}")
+
+
+if __name__ == '__main__':
+    main()
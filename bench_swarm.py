@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Swarm scaling benchmark
+Measures conversation turns/sec against agent count using stub models, so it
+exercises the agent / queue / memory machinery rather than model speed
+"""
+
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+
+import server
+from local_models import model_manager
+
+# Simulated per-call latency (seconds) for each model size
+STUB_LATENCY = {'tiny': 0.002, 'small': 0.003, 'medium': 0.006}
+
+
+def stub_generate(prompt, system_prompt="", model_key='tiny', max_tokens=50, temperature=0.7, **kwargs):
+    time.sleep(STUB_LATENCY.get(model_key, 0.002))
+    return f"{model_key} says something brief."
+
+
+def run(agent_count, turns, mode, swarm_threshold):
+    server.SWARM_MODE_THRESHOLD = swarm_threshold
+    manager = server.ConversationManager()
+    manager.update_settings(mode, 'Benchmark')
+    names = list(server.PERSONALITY_ARCHETYPES.keys())
+    agents_data = {
+        str(i): {'name': names[i] if i < len(names) else f'Agent-{i}', 'personality': []}
+        for i in range(agent_count)
+    }
+
+    tracemalloc.start()
+    manager.register_agents(agents_data)
+    agents_bytes = tracemalloc.get_traced_memory()[0]
+
+    manager.add_message_to_all_memories('User', 'Kick things off.')
+    start = time.perf_counter()
+    responses = 0
+    for _ in range(turns):
+        last = manager.global_history[-1]
+        responses += len(manager.generate_responses(last['content'], last['speaker']))
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    return turns / elapsed, responses / elapsed, agents_bytes / agent_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--agents', type=int, nargs='+', default=[7, 50, 200, 500, 1000])
+    parser.add_argument('--turns', type=int, default=200)
+    parser.add_argument('--mode', default='aggressive')
+    args = parser.parse_args()
+
+    model_manager.generate = stub_generate
+
+    print(f"{'agents':>7} {'swarm':>6} {'turns/s':>9} {'replies/s':>10} {'B/agent':>9}")
+    for count in args.agents:
+        for threshold, label in ((10**9, 'off'), (0, 'on')):
+            with contextlib.redirect_stdout(io.StringIO()):  # Server logs every turn
+                turns_per_sec, replies_per_sec, per_agent = run(count, args.turns, args.mode, threshold)
+            print(f"{count:>7} {label:>6} {turns_per_sec:>9.1f} {replies_per_sec:>10.1f} {per_agent:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Embedding storage benchmark
+Compares the legacy list-of-floats embeddings with the float32 / float16 / int8 /
+PQ stores on synthetic low-rank vectors: memory per million chunks, recall@k
+against exact float32 search and query latency
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from vector_store import make_store
+
+
+def make_vectors(count, dim, rank=64, noise=0.3, seed=0):
+    """Low intrinsic dimensionality plus noise, roughly like model embeddings"""
+    rng = np.random.default_rng(seed)
+    basis = rng.normal(size=(rank, dim))
+    return (rng.normal(size=(count, rank)) @ basis + noise * rng.normal(size=(count, dim))).astype(np.float32)
+
+
+def legacy_bytes_per_vector(dim):
+    """A Python list of boxed floats, as KnowledgeBase.documents used to hold"""
+    sample = [float(x) for x in range(dim)]
+    return sys.getsizeof(sample) + sum(sys.getsizeof(x) for x in sample)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=20000)
+    parser.add_argument('--dim', type=int, default=2048, help='2048 = TinyLlama input embeddings')
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--top-k', type=int, default=10)
+    args = parser.parse_args()
+
+    corpus = make_vectors(args.count + args.queries, args.dim)
+    vectors, queries = corpus[:args.count], corpus[args.count:]
+
+    stores = {}
+    for kind in ('float32', 'float16', 'int8', 'pq'):
+        start = time.perf_counter()
+        store = make_store(kind)
+        for vector in vectors:
+            store.add(vector)
+        stores[kind] = (store, time.perf_counter() - start)
+
+    exact = [set(stores['float32'][0].search(q, args.top_k)) for q in queries]
+    mb_per_million = lambda b: b * 1e6 / 2**20
+
+    print(f"{args.count} vectors x {args.dim} dims, {len(queries)} queries, recall@{args.top_k} vs float32")
+    print(f"{'storage':<14} {'B/vector':>9} {'MB / 1M chunks':>15} {'recall':>7} {'p50 ms':>8} {'ingest s':>9}")
+    legacy = legacy_bytes_per_vector(args.dim)
+    print(f"{'python list':<14} {legacy:>9.0f} {mb_per_million(legacy):>15,.0f} {1.0:>7.3f} {'-':>8} {'-':>9}")
+    for kind, (store, ingest) in stores.items():
+        latencies, recalls = [], []
+        for q, truth in zip(queries, exact):
+            t = time.perf_counter()
+            found = store.search(q, args.top_k)
+            latencies.append(time.perf_counter() - t)
+            recalls.append(len(truth & set(found)) / args.top_k)
+        # Codes scale with the corpus; PQ codebooks are a fixed cost on top
+        per_vector = store.bytes_per_vector()
+        fixed = store.nbytes - per_vector * len(store)
+        print(f"{kind:<14} {per_vector:>9.0f} {mb_per_million(per_vector) + fixed / 2**20:>15,.0f} "
+              f"{statistics.mean(recalls):>7.3f} {1000 * statistics.median(latencies):>8.2f} {ingest:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Near-Duplicate Detection
+Exact content hashing plus MinHash / LSH banding, used by the KnowledgeBase to
+skip redundant chunks before they are embedded and to drop near-identical
+chunks from retrieval results
+"""
+
+import hashlib
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+WORD_RE = re.compile(r"\w+")
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+def normalise(text: str) -> str:
+    """Lowercase, whitespace-collapsed text used for exact hashing"""
+    return ' '.join(WORD_RE.findall(text.lower()))
+
+
+def shingles(text: str, size: int = 3) -> np.ndarray:
+    """32-bit hashes of the word n-grams in a text"""
+    words = WORD_RE.findall(text.lower())
+    if len(words) < size:
+        grams = {' '.join(words)}
+    else:
+        grams = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+class Deduplicator:
+    """Flags exact and near-duplicate texts (estimated Jaccard >= threshold)
+
+    Signatures are `bands * rows` MinHash values; two texts become LSH candidates
+    when all rows of any band agree, and are then confirmed on the full signature.
+    """
+
+    def __init__(self, threshold: float = 0.8, bands: int = 16, rows: int = 8, seed: int = 1):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        rng = np.random.default_rng(seed)
+        num_perm = bands * rows
+        # a, b and the shingle hashes are all < 2^32, so a*x + b fits in uint64
+        self._a = rng.integers(1, MAX_HASH, num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, MAX_HASH, num_perm, dtype=np.uint64)[:, None]
+        self.clear()
+
+    def clear(self):
+        self.exact: Dict[bytes, int] = {}                         # content hash -> item id
+        self.buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self.signatures: Dict[int, np.ndarray] = {}
+        self.digests: Dict[int, bytes] = {}
+        self.skipped = {'exact': 0, 'near': 0}
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature (uint32 per permutation)"""
+        hashes = shingles(text)
+        if not len(hashes):
+            return np.full(self.bands * self.rows, MAX_HASH, dtype=np.uint32)
+        # Universal hashing (a*x + b) mod p, one row per permutation
+        permuted = (self._a * hashes[None, :] + self._b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def similarity(self, sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.mean(sig_a == sig_b))
+
+    def _band_keys(self, sig: np.ndarray):
+        for band in range(self.bands):
+            yield band, sig[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def find_duplicate(self, text: str) -> Tuple[Optional[int], Optional[str], np.ndarray, bytes]:
+        """(matching item id, 'exact' | 'near' | None, signature, content hash)"""
+        digest = hashlib.blake2b(normalise(text).encode(), digest_size=16).digest()
+        sig = self.signature(text)
+        item, kind = self.match(sig, digest)
+        return item, kind, sig, digest
+
+    def match(self, sig: np.ndarray, digest: bytes) -> Tuple[Optional[int], Optional[str]]:
+        """(matching item id, 'exact' | 'near' | None) for an already computed signature and hash"""
+        if digest in self.exact:
+            return self.exact[digest], 'exact'
+        seen = set()
+        for band, key in self._band_keys(sig):
+            for item in self.buckets[band].get(key, ()):
+                if item not in seen:
+                    seen.add(item)
+                    if self.similarity(sig, self.signatures[item]) >= self.threshold:
+                        return item, 'near'
+        return None, None
+
+    def check(self, text: str):
+        """Returns (matching item, kind, signature, digest); kind is None for new content, counted otherwise"""
+        item, kind, sig, digest = self.find_duplicate(text)
+        if kind:
+            self.skipped[kind] += 1
+        return item, kind, sig, digest
+
+    def add(self, item: int, sig: np.ndarray, digest: bytes):
+        """Index an accepted item under its signature and content hash"""
+        self.exact[digest] = item
+        self.signatures[item] = sig
+        self.digests[item] = digest
+        for band, key in self._band_keys(sig):
+            self.buckets[band].setdefault(key, []).append(item)
+
+    def remove(self, item: int):
+        """Forget an item so its content can be added again"""
+        sig = self.signatures.pop(item, None)
+        if sig is None:
+            return
+        digest = self.digests.pop(item)
+        if self.exact.get(digest) == item:
+            del self.exact[digest]
+        for band, key in self._band_keys(sig):
+            bucket = self.buckets[band].get(key)
+            if bucket and item in bucket:
+                bucket.remove(item)
+                if not bucket:
+                    del self.buckets[band][key]
+
+    def distinct(self, items: List[int]) -> List[int]:
+        """Drop items that are near-duplicates of an earlier item in the list"""
+        kept: List[int] = []
+        for item in items:
+            sig = self.signatures.get(item)
+            if sig is None or all(self.similarity(sig, self.signatures[k]) < self.threshold
+                                  for k in kept if k in self.signatures):
+                kept.append(item)
+        return kept
@@ -0,0 +1,48 @@
+"""
+Conversation Journal
+Append-only JSONL record of everything the ConversationManager does - settings,
+messages, speaker selections, prompts, sampling seeds and timings - streamed to
+disk line by line so a long run can be replayed (see replay.py)
+"""
+
+import json
+import threading
+import time
+from typing import Iterator, List
+
+
+class ConversationJournal:
+    """One JSON object per line: {"seq", "t" (seconds since open), "event", ...fields}"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self.seq = 0
+
+    def record(self, event: str, **fields):
+        with self._lock:
+            entry = {'seq': self.seq, 't': round(time.monotonic() - self._start, 4), 'event': event}
+            entry.update(fields)
+            self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._file.flush()
+            self.seq += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def read_journal(path: str) -> Iterator[dict]:
+    """Events from a journal file, in order (a torn final line is ignored)"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                return
+
+
+def load_journal(path: str) -> List[dict]:
+    return list(read_journal(path))
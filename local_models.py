@@ -3,15 +3,40 @@ Local LLM Model Manager
 Manages 3 small LLM models for local inference without API calls
 """
 
-import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
 import os
+import threading
+from functools import lru_cache
 from typing import Optional, List
 import logging
 
+# torch / transformers are imported lazily on first model load so that importing
+# this module (and server.py) stays fast
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=None)
+def text_assist_path() -> Optional[str]:
+    """How the installed transformers drafts across tokenizers when sampling
+    
+    'universal' - universal assisted decoding; prunes the draft's LM head and input
+                  embeddings to the target vocabulary in place, so the draft model
+                  must not be used for anything else
+    'text'      - text-level assisted decoding; leaves the draft untouched
+    None        - no assisted decoding across tokenizers
+    """
+    try:
+        from transformers.generation import candidate_generator
+    except ImportError:
+        return None
+    if hasattr(candidate_generator, 'UniversalSpeculativeDecodingGenerator'):
+        return 'universal'
+    if hasattr(candidate_generator, 'AssistedCandidateGeneratorDifferentTokenizers'):
+        return 'text'
+    return None
+
+
 class LocalModelManager:
     """Manages multiple local LLM models for inference"""
     
@@ -19,78 +44,159 @@ class LocalModelManager:
         self.models = {}
         self.tokenizers = {}
         self.pipelines = {}
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        logger.info(f"Using device: {self.device}")
+        self.stub_mode = False  # Canned responses, never loads weights (fast boot / tests)
+        self._device = None
+        self._load_lock = threading.Lock()
         
         # Model configurations - 3 smallest models
+        # (8-bit loading only applies when running on CUDA)
         self.model_configs = {
             'tiny': {
                 'name': 'TinyLlama/TinyLlama-1.1B-Chat-v1.0',
                 'max_length': 512,
                 'temperature': 0.7,
-                'load_in_8bit': True if self.device == 'cuda' else False
+                'load_in_8bit': True,
+                'thread_weight': 1  # Share of CPU threads relative to the other models
             },
             'small': {
                 'name': 'Qwen/Qwen2.5-0.5B-Instruct',
                 'max_length': 512,
                 'temperature': 0.7,
-                'load_in_8bit': True if self.device == 'cuda' else False
+                'load_in_8bit': True,
+                'thread_weight': 1
             },
             'medium': {
                 'name': 'microsoft/Phi-2',
                 'max_length': 512,
                 'temperature': 0.7,
-                'load_in_8bit': True if self.device == 'cuda' else False
+                'load_in_8bit': True,
+                'thread_weight': 2,
+                # Speculative decoding: the draft model proposes tokens that this
+                # model verifies. Set to None to disable.
+                'draft_model': 'tiny',
+                'num_assistant_tokens': 5
             }
         }
+        self._speculative_modes = {}  # model_key -> 'token' | 'text' | None
+        self.draft_models = {}        # Target model_key -> private (draft model, tokenizer), see _prepare_drafts
+        self.speculative_stats = {}   # model_key -> acceptance / throughput counters
+        self.generation_stats = {}    # model_key -> tokens decoded / latency counters
+        
+        # Runtime tuning (see runtime.py)
+        self.compile_models = os.environ.get('TORCH_COMPILE') == '1'
+        self.warmup_enabled = os.environ.get('MODEL_WARMUP', '1') != '0'
+        self._thread_plan = None
+        self.runtime_stats = {}       # model_key -> threads / compile / cold vs warm latency
+        
+        # A seed reseeds torch's single global CPU generator, which every model thread
+        # samples from; serialising seeded generations keeps one thread's reseed from
+        # interleaving with another's draws (on while journaling, see replay.py)
+        self.serialize_seeded = os.environ.get('DETERMINISTIC_SAMPLING') == '1'
+        self._seeded_lock = threading.Lock()
+    
+    @property
+    def device(self):
+        """Torch device, resolved on first use (imports torch)"""
+        if self._device is None:
+            import torch
+            self._device = "cuda" if torch.cuda.is_available() else "cpu"
+            logger.info(f"Using device: {self._device}")
+        return self._device
+    
+    def thread_plan(self) -> dict:
+        """model_key -> (intra-op threads, pinned cores), computed once from the CPU count"""
+        if self._thread_plan is None:
+            from runtime import available_cores, core_sets, parse_thread_overrides, thread_budgets
+            cores = available_cores()
+            weights = {key: config.get('thread_weight', 1) for key, config in self.model_configs.items()}
+            budgets = thread_budgets(weights, len(cores), parse_thread_overrides(os.environ.get('MODEL_THREADS')))
+            pinned = core_sets(budgets, cores) if os.environ.get('MODEL_CPU_PINNING') == '1' else {}
+            self._thread_plan = {key: (budgets[key], pinned.get(key, [])) for key in budgets}
+            logger.info(f"Thread budgets over {len(cores)} cores: {budgets}")
+        return self._thread_plan
+    
+    def _apply_runtime(self, model_key: str):
+        """Apply model_key's thread budget to the calling (inference worker) thread"""
+        if self.device != 'cpu':
+            return
+        from runtime import apply_thread_budget
+        threads, cores = self.thread_plan().get(model_key, (1, []))
+        apply_thread_budget(threads, cores)
+    
+    def enable_stub_mode(self):
+        """Serve canned responses without loading any model weights"""
+        self.stub_mode = True
+        logger.info("Stub mode enabled - no models will be loaded")
     
     def load_model(self, model_key: str):
         """Load a specific model"""
-        if model_key in self.models:
-            logger.info(f"Model {model_key} already loaded")
-            return True
+        if self.stub_mode:
+            return False
         
         if model_key not in self.model_configs:
             logger.error(f"Unknown model key: {model_key}")
             return False
         
+        # Background loading and load-on-first-use can race for the same model
+        with self._load_lock:
+            if model_key in self.models:
+                logger.info(f"Model {model_key} already loaded")
+                return True
+            return self._load_model(model_key)
+    
+    def _load_weights(self, model_key: str):
+        """(tokenizer, model) for a model_configs entry, on this manager's device"""
+        import torch
+        from transformers import AutoTokenizer, AutoModelForCausalLM
+        
         config = self.model_configs[model_key]
         model_name = config['name']
         
-        try:
-            logger.info(f"Loading model: {model_name}...")
-            
-            # Load tokenizer
-            tokenizer = AutoTokenizer.from_pretrained(
+        # Load tokenizer
+        tokenizer = AutoTokenizer.from_pretrained(
+            model_name,
+            trust_remote_code=True
+        )
+        
+        # Set pad token if not exists
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        
+        # Load model with quantization if GPU available
+        if config.get('load_in_8bit') and self.device == 'cuda':
+            from transformers import BitsAndBytesConfig
+            quantization_config = BitsAndBytesConfig(
+                load_in_8bit=True,
+                llm_int8_threshold=6.0
+            )
+            model = AutoModelForCausalLM.from_pretrained(
                 model_name,
-                trust_remote_code=True
+                quantization_config=quantization_config,
+                device_map="auto",
+                trust_remote_code=True,
+                torch_dtype=torch.float16
             )
+        else:
+            model = AutoModelForCausalLM.from_pretrained(
+                model_name,
+                trust_remote_code=True,
+                torch_dtype=torch.float16 if self.device == 'cuda' else torch.float32
+            )
+            model.to(self.device)
+        return tokenizer, model
+    
+    def _load_model(self, model_key: str):
+        config = self.model_configs[model_key]
+        model_name = config['name']
+        
+        try:
+            import torch
+            from transformers import pipeline
+            from runtime import configure_torch
             
-            # Set pad token if not exists
-            if tokenizer.pad_token is None:
-                tokenizer.pad_token = tokenizer.eos_token
-            
-            # Load model with quantization if GPU available
-            if config.get('load_in_8bit') and self.device == 'cuda':
-                from transformers import BitsAndBytesConfig
-                quantization_config = BitsAndBytesConfig(
-                    load_in_8bit=True,
-                    llm_int8_threshold=6.0
-                )
-                model = AutoModelForCausalLM.from_pretrained(
-                    model_name,
-                    quantization_config=quantization_config,
-                    device_map="auto",
-                    trust_remote_code=True,
-                    torch_dtype=torch.float16
-                )
-            else:
-                model = AutoModelForCausalLM.from_pretrained(
-                    model_name,
-                    trust_remote_code=True,
-                    torch_dtype=torch.float16 if self.device == 'cuda' else torch.float32
-                )
-                model.to(self.device)
+            configure_torch(int(os.environ.get('TORCH_INTEROP_THREADS', 1)))
+            logger.info(f"Loading model: {model_name}...")
+            tokenizer, model = self._load_weights(model_key)
             
             # Create pipeline for easier inference
             pipe = pipeline(
@@ -105,7 +211,17 @@ class LocalModelManager:
             self.tokenizers[model_key] = tokenizer
             self.pipelines[model_key] = pipe
             
+            threads, cores = self.thread_plan().get(model_key, (1, []))
+            stats = self.runtime_stats.setdefault(model_key, {})
+            stats.update(threads=threads if self.device == 'cpu' else None, cores=cores, compiled=False)
+            if self.compile_models:
+                from runtime import compile_model
+                stats['compiled'] = compile_model(model)
+            if self.warmup_enabled:
+                self.warmup(model_key)
+            
             logger.info(f"✅ Successfully loaded {model_name}")
+            self._prepare_drafts()
             return True
             
         except Exception as e:
@@ -114,6 +230,248 @@ class LocalModelManager:
             traceback.print_exc()
             return False
     
+    def _fall_back_to_eager(self, model_key: str, error: Exception) -> bool:
+        """Drop a compiled forward that failed; True if there was one to drop"""
+        if not self.runtime_stats.get(model_key, {}).get('compiled'):
+            return False
+        from runtime import restore_eager
+        logger.warning(f"torch.compile failed for {model_key}, falling back to eager: {error}")
+        restore_eager(self.models[model_key])
+        self.runtime_stats[model_key]['compiled'] = False
+        return True
+    
+    def warmup(self, model_key: str):
+        """Pay one-time costs at load: time first-token latency cold, then warm, per prompt length"""
+        import time
+        import torch
+        from runtime import WARMUP_PROMPT_TOKENS, warmup_prompt
+        
+        model = self.models[model_key]
+        tokenizer = self.tokenizers[model_key]
+        self._apply_runtime(model_key)
+        limit = getattr(model.config, 'max_position_embeddings', None) or self.model_configs[model_key]['max_length']
+        lengths = [n for n in WARMUP_PROMPT_TOKENS if n + 16 <= limit] or [min(WARMUP_PROMPT_TOKENS[0], limit // 2)]
+        prompts = {n: tokenizer(warmup_prompt(tokenizer, n), return_tensors='pt', truncation=True,
+                                max_length=n).to(model.device) for n in lengths}
+        
+        def timed_generate(inputs, new_tokens):
+            start = time.perf_counter()
+            with torch.no_grad():
+                model.generate(**inputs, max_new_tokens=new_tokens, do_sample=False,
+                               pad_token_id=tokenizer.pad_token_id)
+            return 1000 * (time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        try:
+            cold = {}
+            for n, inputs in prompts.items():
+                cold[n] = timed_generate(inputs, 1)
+                timed_generate(inputs, 8)  # Exercise the decode loop at this length too
+            warm = {n: timed_generate(inputs, 1) for n, inputs in prompts.items()}
+        except Exception as e:
+            if self._fall_back_to_eager(model_key, e):
+                return self.warmup(model_key)
+            logger.warning(f"Warmup failed for {model_key}: {e}")
+            return
+        
+        self.runtime_stats[model_key].update(
+            warmup_seconds=round(time.perf_counter() - start, 2),
+            cold_first_token_ms={n: round(ms, 1) for n, ms in cold.items()},
+            warm_first_token_ms={n: round(ms, 1) for n, ms in warm.items()}
+        )
+        logger.info(f"Warmed up {model_key}: first token {cold[lengths[0]]:.0f} ms cold -> "
+                    f"{warm[lengths[0]]:.0f} ms warm ({lengths[0]}-token prompt)")
+    
+    def runtime_report(self) -> dict:
+        """Thread budget, compile state and cold vs warm first-token latency per model"""
+        return {key: dict(stats) for key, stats in self.runtime_stats.items()}
+    
+    def speculative_mode(self, model_key: str) -> Optional[str]:
+        """How model_key can use its draft model: 'token', 'text' or None
+        
+        'token' - draft and target share a tokenizer, so draft tokens are verified directly
+        'text'  - different tokenizers; transformers translates the draft (see text_assist_path)
+        """
+        draft_key = self.model_configs.get(model_key, {}).get('draft_model')
+        if not draft_key or draft_key == model_key:
+            return None
+        # Never force-load a draft; fall back to plain decoding until it's ready
+        if draft_key not in self.models or model_key not in self.models:
+            return None
+        if model_key not in self._speculative_modes:
+            self._speculative_modes[model_key] = self._detect_speculative_mode(model_key, draft_key)
+        mode = self._speculative_modes[model_key]
+        if self._needs_private_draft(model_key) and model_key not in self.draft_models:
+            return None  # Plain decoding until the private draft copy is loaded
+        return mode
+    
+    def _detect_speculative_mode(self, model_key: str, draft_key: str) -> Optional[str]:
+        if self.tokenizers[model_key].get_vocab() == self.tokenizers[draft_key].get_vocab():
+            mode = 'token'
+        elif text_assist_path():
+            mode = 'text'
+        else:
+            import transformers
+            logger.warning(
+                f"Speculative decoding disabled for {model_key}: {draft_key} uses a different "
+                f"tokenizer and transformers {transformers.__version__} lacks assisted decoding across tokenizers"
+            )
+            mode = None
+        if mode:
+            logger.info(f"Speculative decoding enabled: {draft_key} drafts for {model_key} ({mode}-level)")
+        return mode
+    
+    def _needs_private_draft(self, model_key: str) -> bool:
+        """True when sampling would make transformers modify the draft model in place"""
+        return self._speculative_modes.get(model_key) == 'text' and text_assist_path() == 'universal'
+    
+    def _prepare_drafts(self):
+        """Load a private draft copy for each loaded target whose draft transformers would prune
+        
+        The shared draft model keeps serving its own agents and RAG embeddings.
+        """
+        for model_key, config in self.model_configs.items():
+            if model_key in self.draft_models or self.speculative_mode(model_key) is not None:
+                continue
+            if not self._needs_private_draft(model_key):
+                continue
+            draft_key = config['draft_model']
+            logger.info(f"Loading a private copy of {draft_key} to draft for {model_key}...")
+            try:
+                tokenizer, draft = self._load_weights(draft_key)
+            except Exception as e:
+                logger.warning(f"Speculative decoding disabled for {model_key}: could not load its draft: {e}")
+                self._speculative_modes[model_key] = None
+                continue
+            self.draft_models[model_key] = (draft, tokenizer)
+    
+    def _generate_tokens(self, formatted_prompt: str, model_key: str, stopper, speculative: Optional[str] = None,
+                         seed: Optional[int] = None, **gen_kwargs) -> str:
+        """Run model.generate (optionally assisted by the draft model) and record stats
+        
+        seed reseeds torch's sampler first, so the same seed and prompt reproduce a reply
+        as long as no other model samples concurrently (see serialize_seeded).
+        """
+        import contextlib
+        import time
+        import torch
+        from transformers import StoppingCriteriaList
+        
+        model = self.models[model_key]
+        tokenizer = self.tokenizers[model_key]
+        self._apply_runtime(model_key)
+        inputs = tokenizer(formatted_prompt, return_tensors='pt').to(model.device)
+        stopper.prompt_length = inputs['input_ids'].shape[1]
+        gen_kwargs['stopping_criteria'] = StoppingCriteriaList([stopper])
+        
+        hooks = []
+        forwards = {'target': 0, 'proposed': 0}
+        if speculative:
+            config = self.model_configs[model_key]
+            draft_key = config['draft_model']
+            draft, draft_tokenizer = self.draft_models.get(model_key) or (self.models[draft_key],
+                                                                         self.tokenizers[draft_key])
+            draft.generation_config.num_assistant_tokens = config.get('num_assistant_tokens', 5)
+            gen_kwargs['assistant_model'] = draft
+            if speculative == 'text':
+                gen_kwargs.update(tokenizer=tokenizer, assistant_tokenizer=draft_tokenizer)
+            
+            # Count the target's verification passes made by this thread. Each pass is fed
+            # one known token (the whole prompt on the first pass) plus the round's draft
+            # candidates, already in target tokens - in 'text' mode the draft's own forward
+            # passes don't map to target tokens, so they aren't counted
+            thread_id = threading.get_ident()
+            def count_target(module, args, kwargs, output):
+                if threading.get_ident() != thread_id:
+                    return
+                input_ids = kwargs.get('input_ids', args[0] if args else None)
+                if input_ids is not None:
+                    known = stopper.prompt_length if not forwards['target'] else 1
+                    forwards['proposed'] += max(0, input_ids.shape[1] - known)
+                forwards['target'] += 1
+            hooks = [model.register_forward_hook(count_target, with_kwargs=True)]
+        
+        seeded = seed is not None and self.serialize_seeded
+        try:
+            with self._seeded_lock if seeded else contextlib.nullcontext():
+                start = time.perf_counter()
+                try:
+                    if seed is not None:
+                        torch.manual_seed(seed)
+                    with torch.no_grad():
+                        output = model.generate(**inputs, **gen_kwargs)
+                except Exception as e:
+                    if self._fall_back_to_eager(model_key, e):
+                        pass
+                    elif speculative:
+                        # Assisted decoding failed: answer with plain decoding, and stop drafting
+                        logger.warning(f"Speculative decoding failed for {model_key}, disabling it: {e}")
+                        self._speculative_modes[model_key] = None
+                        for h in hooks:
+                            h.remove()
+                        hooks, speculative = [], None
+                        for key in ('assistant_model', 'tokenizer', 'assistant_tokenizer'):
+                            gen_kwargs.pop(key, None)
+                        stopper.stopped_early = False
+                    else:
+                        raise
+                    start = time.perf_counter()
+                    if seed is not None:
+                        torch.manual_seed(seed)
+                    with torch.no_grad():
+                        output = model.generate(**inputs, **gen_kwargs)
+                elapsed = time.perf_counter() - start
+        finally:
+            for h in hooks:
+                h.remove()
+        
+        new_tokens = output[0, stopper.prompt_length:]
+        stats = self.generation_stats.setdefault(model_key, {
+            'calls': 0, 'new_tokens': 0, 'seconds': 0.0, 'early_stops': 0
+        })
+        stats['calls'] += 1
+        stats['new_tokens'] += len(new_tokens)
+        stats['seconds'] += elapsed
+        stats['early_stops'] += int(stopper.stopped_early)
+        
+        if speculative:
+            stats = self.speculative_stats.setdefault(model_key, {
+                'calls': 0, 'new_tokens': 0, 'proposed': 0, 'accepted': 0, 'seconds': 0.0
+            })
+            stats['calls'] += 1
+            stats['new_tokens'] += len(new_tokens)
+            stats['seconds'] += elapsed
+            # Every verification pass yields its accepted draft tokens plus one of its own
+            stats['proposed'] += forwards['proposed']
+            stats['accepted'] += max(0, len(new_tokens) - forwards['target'])
+        return tokenizer.decode(new_tokens, skip_special_tokens=True)
+    
+    def speculative_report(self) -> dict:
+        """Acceptance rate and tokens/sec per model using speculative decoding"""
+        report = {}
+        for key, s in self.speculative_stats.items():
+            report[key] = {
+                'draft_model': self.model_configs[key].get('draft_model'),
+                'mode': self._speculative_modes.get(key),
+                'calls': s['calls'],
+                'acceptance_rate': s['accepted'] / s['proposed'] if s['proposed'] else 0.0,
+                'tokens_per_sec': s['new_tokens'] / s['seconds'] if s['seconds'] else 0.0
+            }
+        return report
+    
+    def generation_report(self) -> dict:
+        """Tokens decoded per response, latency and early-stop rate per model"""
+        report = {}
+        for key, s in self.generation_stats.items():
+            calls = s['calls'] or 1
+            report[key] = {
+                'calls': s['calls'],
+                'avg_new_tokens': s['new_tokens'] / calls,
+                'avg_latency_ms': 1000 * s['seconds'] / calls,
+                'early_stop_rate': s['early_stops'] / calls
+            }
+        return report
+    
     def load_all_models(self):
         """Load all 3 models"""
         logger.info("Loading all local models...")
@@ -129,9 +487,17 @@ class LocalModelManager:
         model_key: str = 'tiny',
         max_tokens: int = 50,
         temperature: float = 0.7,
+        max_sentences: int = 0,
         **kwargs
     ) -> str:
-        """Generate text using a local model"""
+        """Generate text using a local model
+        
+        Decoding stops early at the model's end-of-turn markers, and after
+        max_sentences complete sentences when that is non-zero.
+        """
+        
+        if self.stub_mode:
+            return f"({model_key} stub) Noted: {prompt.splitlines()[-1][:60] if prompt else ''}"
         
         if model_key not in self.pipelines:
             logger.warning(f"Model {model_key} not loaded, loading now...")
@@ -159,12 +525,23 @@ class LocalModelManager:
                 # Phi-2 format
                 formatted_prompt = f"System: {system_prompt}\n\nUser: {prompt}\n\nAssistant:"
             
-            pipe = self.pipelines[model_key]
-            config = self.model_configs[model_key]
+            from stopping import STOP_SEQUENCES, TurnStoppingCriteria
+            
+            use_draft = kwargs.pop('speculative', True)
+            seed = kwargs.pop('seed', None)
+            stopper = TurnStoppingCriteria(
+                self.tokenizers[model_key],
+                STOP_SEQUENCES.get(model_key, STOP_SEQUENCES['medium']),
+                max_sentences
+            )
             
-            # Generate
-            outputs = pipe(
+            # Generate (speculatively when a compatible draft model is loaded)
+            generated_text = self._generate_tokens(
                 formatted_prompt,
+                model_key,
+                stopper,
+                speculative=use_draft and self.speculative_mode(model_key),
+                seed=seed,
                 max_new_tokens=max_tokens,
                 temperature=temperature,
                 do_sample=True,
@@ -172,14 +549,11 @@ class LocalModelManager:
                 repetition_penalty=1.1,
                 pad_token_id=self.tokenizers[model_key].pad_token_id,
                 eos_token_id=self.tokenizers[model_key].eos_token_id,
-                return_full_text=False,
                 **kwargs
             )
+            generated_text = stopper.trim(generated_text)
             
-            # Extract generated text
-            generated_text = outputs[0]['generated_text'].strip()
-            
-            # Clean up response based on model
+            # Clean up response based on model (stop sequences normally catch these)
             if model_key == 'tiny':
                 # Remove any remaining tags
                 generated_text = generated_text.split('<|assistant|>')[-1].strip()
@@ -200,6 +574,8 @@ class LocalModelManager:
         """Get embedding for text (simple token-based for now)"""
         # For simplicity, we'll use a basic embedding approach
         # In production, you'd want a dedicated embedding model
+        if self.stub_mode:
+            return None
         try:
             tokenizer = self.tokenizers.get(model_key)
             if not tokenizer:
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Conversation Replay
+Re-drives a recorded run from its journal (see journal.py) and compares timings.
+
+Each turn replays the recorded speakers with their recorded sampling seeds
+(the session's RNG seed is reused too), and each reply uses the recorded model.
+After a reply is generated, the recorded text is what goes into the shared
+history. Prompts therefore match the original run even when the replayed
+models answer differently, and before/after timings compare like for like.
+
+    python3 replay.py run.jsonl                  # against the real models
+    python3 replay.py run.jsonl --stub           # against stub models
+    python3 replay.py --compare before.jsonl after.jsonl
+
+Journals from several concurrent sessions are replayed sequentially, in
+journal order. Speakers and seeds still match, but prompts can differ wherever
+the sessions' replies interleaved in the shared history.
+"""
+
+import argparse
+import os
+import statistics
+from collections import defaultdict
+
+from journal import ConversationJournal, load_journal
+
+
+def summarise(events):
+    """Per-turn and per-model timings from a journal"""
+    turns = [e for e in events if e['event'] == 'turn_end']
+    responses = [e for e in events if e['event'] == 'response']
+    by_model = defaultdict(list)
+    for e in responses:
+        by_model[e['model']].append(e['ms'])
+    return {
+        'turns': len(turns),
+        'responses': len(responses),
+        'turn_ms': [e['ms'] for e in turns],
+        'response_ms': [e['ms'] for e in responses],
+        'by_model': dict(by_model),
+        'retrieval_ms': [e['retrieval_ms'] for e in events if e['event'] == 'turn'],
+    }
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def compare(before, after):
+    """Print timing deltas and how closely the replay followed the recording"""
+    a, b = summarise(before), summarise(after)
+    print(f"{'':<22} {'before':>10} {'after':>10} {'change':>8}")
+
+    def row(label, x, y):
+        change = f"{(y - x) / x:+.1%}" if x else '-'
+        print(f"{label:<22} {x:>10.1f} {y:>10.1f} {change:>8}")
+
+    row('turns', a['turns'], b['turns'])
+    row('total turn ms', sum(a['turn_ms']), sum(b['turn_ms']))
+    row('turn p50 ms', percentile(a['turn_ms'], 0.5), percentile(b['turn_ms'], 0.5))
+    row('turn p95 ms', percentile(a['turn_ms'], 0.95), percentile(b['turn_ms'], 0.95))
+    row('reply p50 ms', percentile(a['response_ms'], 0.5), percentile(b['response_ms'], 0.5))
+    row('retrieval mean ms', statistics.fmean(a['retrieval_ms'] or [0]), statistics.fmean(b['retrieval_ms'] or [0]))
+    for model in sorted(set(a['by_model']) | set(b['by_model'])):
+        row(f'{model} reply mean ms', statistics.fmean(a['by_model'].get(model) or [0]),
+            statistics.fmean(b['by_model'].get(model) or [0]))
+
+    turns_a = [e for e in before if e['event'] == 'turn']
+    turns_b = [e for e in after if e['event'] == 'turn']
+    same_speakers = sum(x['speakers'] == y['speakers'] and x['seeds'] == y['seeds'] for x, y in zip(turns_a, turns_b))
+    replies_a = [e for e in before if e['event'] == 'response']
+    replies_b = [e for e in after if e['event'] == 'response']
+    same_prompts = sum(x['prompt'] == y['prompt'] for x, y in zip(replies_a, replies_b))
+    same_text = sum(x['message'] == y['message'] for x, y in zip(replies_a, replies_b))
+    print(f"speaker selections matched: {same_speakers}/{len(turns_a)}   prompts matched: "
+          f"{same_prompts}/{len(replies_a)}   identical replies: {same_text}/{len(replies_a)}")
+
+
+def replay(events, out_path, stub):
+    if stub:
+        os.environ['SWARMS_NO_MODELS'] = '1'
+    os.environ.pop('CONVERSATION_JOURNAL', None)  # The replay writes its own journal
+    import server
+
+    session = next((e for e in events if e['event'] == 'session'), None)
+    if session is None:
+        raise SystemExit('Journal has no session entry')
+    server.SWARM_MODE_THRESHOLD = session['swarm_mode_threshold']
+    server.MEMORY_SIZE = session['memory_size']
+    if not stub:
+        for key, name in session['models'].items():
+            if key in server.model_manager.model_configs:
+                server.model_manager.model_configs[key]['name'] = name
+        server.load_models()
+
+    class ReplayConversationManager(server.ConversationManager):
+        """Uses the recorded model per reply and feeds recorded replies back into history"""
+
+        recorded = {}  # Agent name -> recorded response for the current turn
+        turn_event = None
+
+        def pick_speakers(self, prompt, sender):
+            # Taken from the journal rather than re-drawn: with concurrent sessions,
+            # selection also depended on how their replies interleaved
+            by_name = {agent.name: agent for agent in self.agents.values()}
+            picked = [(by_name[name], seed) for name, seed in zip(self.turn_event['speakers'], self.turn_event['seeds'])
+                      if name in by_name]
+            return [agent for agent, _ in picked], [seed for _, seed in picked]
+
+        def choose_model(self, agent):
+            response = self.recorded.get(agent.name)
+            return response['model'] if response else None
+
+        def remember_reply(self, agent, message):
+            response = self.recorded.get(agent.name)
+            super().remember_reply(agent, response['message'] if response else message)
+
+    manager = ReplayConversationManager(seed=session['seed'])
+    manager.conversation_mode, manager.conversation_topic = session['mode'], session['topic']
+    server.conversation_manager = manager
+    server.knowledge_base.clear()
+    manager.attach_journal(ConversationJournal(out_path))
+
+    recorded = defaultdict(dict)  # Turn -> agent name -> recorded response
+    for event in events:
+        if event['event'] == 'response':
+            recorded[event['turn']][event['agent']] = event
+
+    for event in events:
+        kind = event['event']
+        if kind == 'agents':
+            manager.register_agents(event['agents'])
+        elif kind == 'settings':
+            manager.update_settings(event['mode'], event['topic'], event.get('sources'))
+        elif kind == 'message':
+            manager.add_message_to_all_memories(event['speaker'], event['content'])
+        elif kind == 'document':
+            server.upload_document_payload({'text': event['text'], 'filename': event['filename'],
+                                            'replace': event.get('replace')})
+        elif kind == 'delete_document':
+            server.delete_document_payload({'filename': event['filename']})
+        elif kind == 'clear_knowledge':
+            manager.record_event('clear_knowledge')
+            server.knowledge_base.clear()
+        elif kind == 'turn':
+            manager.recorded = recorded[event['turn']]
+            manager.turn_event = event
+            manager.generate_responses(event['prompt'], event['sender'], event['kind'], event['shorten'])
+    manager.journal.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('journal', nargs='?', help='journal to replay')
+    parser.add_argument('--stub', action='store_true', help='replay against stub models')
+    parser.add_argument('--out', help='journal written by the replay (default: <journal>.replay.jsonl)')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help='only compare two journals')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(load_journal(args.compare[0]), load_journal(args.compare[1]))
+        return
+    if not args.journal:
+        parser.error('a journal (or --compare) is required')
+
+    events = load_journal(args.journal)
+    out_path = args.out or f"{os.path.splitext(args.journal)[0]}.replay.jsonl"
+    if os.path.exists(out_path):
+        os.remove(out_path)
+    replay(events, out_path, args.stub)
+    compare(events, load_journal(out_path))
+
+
+if __name__ == '__main__':
+    main()
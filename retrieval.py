@@ -0,0 +1,123 @@
+"""
+Lexical Retrieval
+Incremental BM25 inverted index used alongside the KnowledgeBase embeddings,
+plus reciprocal-rank fusion for hybrid lexical + vector ranking
+"""
+
+import math
+import re
+from array import array
+from collections import Counter
+from typing import Container, Dict, Iterable, List, Optional, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have he her his i in is it its of on or
+she that the their them they this to was were what when where which who why will with
+you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens without stopwords"""
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """Append-only BM25 index with compact per-term postings arrays
+
+    Postings are parallel array('I') doc ids / array('H') term frequencies,
+    so adding a document only appends to the arrays of the terms it contains.
+    Removed documents are tombstoned and skipped until compact() rewrites the
+    postings without them; doc ids are never reused.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.doc_lengths = array('I')
+        self.total_length = 0
+        self.deleted = set()  # Tombstoned doc ids still present in postings
+        self.removed = 0      # All removed doc ids, compacted or not
+
+    def __len__(self):
+        """Number of live documents"""
+        return len(self.doc_lengths) - self.removed
+
+    def add(self, text: str) -> int:
+        """Index a document and return its id (ids are assigned sequentially)"""
+        doc_id = len(self.doc_lengths)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = (array('I'), array('H'))
+            postings[0].append(doc_id)
+            postings[1].append(min(tf, 0xFFFF))
+        length = sum(counts.values())
+        self.doc_lengths.append(length)
+        self.total_length += length
+        return doc_id
+
+    def remove(self, doc_id: int):
+        """Tombstone a document so it no longer scores or counts toward corpus stats"""
+        if doc_id in self.deleted:
+            return
+        self.deleted.add(doc_id)
+        self.removed += 1
+        self.total_length -= self.doc_lengths[doc_id]
+
+    def compact(self):
+        """Rewrite postings without tombstoned documents"""
+        if not self.deleted:
+            return
+        deleted = self.deleted
+        for term, (doc_ids, tfs) in list(self.postings.items()):
+            kept = [(d, tf) for d, tf in zip(doc_ids, tfs) if d not in deleted]
+            if not kept:
+                del self.postings[term]
+            elif len(kept) < len(doc_ids):
+                self.postings[term] = (array('I', (d for d, _ in kept)), array('H', (tf for _, tf in kept)))
+        self.deleted = set()
+
+    def scores(self, query: str) -> Dict[int, float]:
+        """BM25 score for every live document sharing a term with the query"""
+        n = len(self)
+        if not n:
+            return {}
+        avg_length = self.total_length / n or 1.0
+        k1, b = self.k1, self.b
+        lengths = self.doc_lengths
+        deleted = self.deleted
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            doc_ids, tfs = postings
+            df = len(doc_ids) - (sum(1 for d in doc_ids if d in deleted) if deleted else 0)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for doc_id, tf in zip(doc_ids, tfs):
+                if deleted and doc_id in deleted:
+                    continue
+                norm = k1 * (1 - b + b * lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, query: str, top_k: int = 10, allowed: Optional[Container[int]] = None) -> List[Tuple[int, float]]:
+        """Top-k (doc_id, score) pairs, best first, optionally only among `allowed` doc ids"""
+        scores = self.scores(query)
+        if allowed is not None:
+            scores = {doc_id: score for doc_id, score in scores.items() if doc_id in allowed}
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[int]], k: int = 60) -> List[int]:
+    """Fuse several best-first rankings of doc ids into one (RRF, Cormack et al. 2009)"""
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused, key=fused.get, reverse=True)
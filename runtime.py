@@ -0,0 +1,134 @@
+"""
+Inference Runtime Tuning
+CPU thread budgets, optional core pinning, torch.compile with eager fallback
+and warmup helpers used by the LocalModelManager
+
+Each model is served from its own worker thread (see swarm.InferenceQueue).
+Budgets are applied per thread, so models stop oversubscribing the same cores:
+
+    MODEL_THREADS=tiny=2,small=2,medium=4   explicit intra-op threads per model
+    MODEL_CPU_PINNING=1                     pin each model's thread to its own cores (Linux)
+    TORCH_INTEROP_THREADS=1                 inter-op pool size (set once, before first use)
+    TORCH_COMPILE=1                         compile model forwards, falling back to eager
+    MODEL_WARMUP=0                          skip the warmup pass at load time
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Prompt lengths (tokens) exercised at load time; agent prompts land in this range
+WARMUP_PROMPT_TOKENS = (32, 128, 384)
+WARMUP_FILLER = "The agents keep talking about memory, doubt, swarms and what a good argument looks like. "
+
+_configured = False
+_thread_state = threading.local()
+
+
+def available_cores() -> List[int]:
+    """CPU ids this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def parse_thread_overrides(spec: Optional[str]) -> Dict[str, int]:
+    """'tiny=2,medium=4' -> {'tiny': 2, 'medium': 4}"""
+    overrides = {}
+    for part in (spec or '').split(','):
+        if '=' in part:
+            key, value = part.split('=', 1)
+            overrides[key.strip()] = max(1, int(value))
+    return overrides
+
+
+def thread_budgets(weights: Dict[str, float], cores: int, overrides: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Split `cores` between models in proportion to their weights (at least one each)"""
+    overrides = overrides or {}
+    budgets = dict(overrides)
+    remaining = max(0, cores - sum(overrides.values()))
+    auto = {key: weight for key, weight in weights.items() if key not in overrides}
+    total = sum(auto.values()) or 1.0
+    for key, weight in auto.items():
+        budgets[key] = max(1, int(remaining * weight / total))
+    return budgets
+
+
+def core_sets(budgets: Dict[str, int], cores: List[int]) -> Dict[str, List[int]]:
+    """Disjoint core lists per model; empty when there aren't enough cores to go round"""
+    if sum(budgets.values()) > len(cores):
+        return {key: [] for key in budgets}
+    sets, start = {}, 0
+    for key, threads in budgets.items():
+        sets[key] = cores[start:start + threads]
+        start += threads
+    return sets
+
+
+def configure_torch(interop_threads: int = 1):
+    """Process-wide torch settings; the inter-op pool can only be sized before first use"""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+    import torch
+    try:
+        torch.set_num_interop_threads(interop_threads)
+    except RuntimeError as e:
+        logger.warning(f"Could not set inter-op threads: {e}")
+
+
+def apply_thread_budget(threads: int, cores: Iterable[int] = ()):
+    """Give the calling thread `threads` intra-op threads (and pin it to `cores`)
+
+    torch initialises a thread's OpenMP team size lazily from the last global
+    set_num_threads value, so force that first and then set our own.
+    """
+    cores = tuple(cores)
+    if getattr(_thread_state, 'budget', None) == (threads, cores):
+        return
+    import torch
+    torch.get_num_threads()
+    torch.set_num_threads(threads)
+    if cores and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, cores)  # 0 == the calling thread on Linux
+        except OSError as e:
+            logger.warning(f"Could not pin thread to cores {cores}: {e}")
+    _thread_state.budget = (threads, cores)
+
+
+def compile_model(model) -> bool:
+    """Wrap model.forward with torch.compile; False (model untouched) if unavailable
+
+    Compilation itself happens on first call, so callers must still be ready to
+    fall back with restore_eager().
+    """
+    import torch
+    if not hasattr(torch, 'compile'):
+        return False
+    try:
+        model._eager_forward = model.forward
+        model.forward = torch.compile(model.forward, dynamic=True)
+        return True
+    except Exception as e:
+        logger.warning(f"torch.compile unavailable, using eager mode: {e}")
+        restore_eager(model)
+        return False
+
+
+def restore_eager(model):
+    """Undo compile_model"""
+    eager = getattr(model, '_eager_forward', None)
+    if eager is not None:
+        model.forward = eager
+        del model._eager_forward
+
+
+def warmup_prompt(tokenizer, tokens: int) -> str:
+    """Filler text that tokenizes to roughly `tokens` tokens"""
+    per_copy = max(1, len(tokenizer.encode(WARMUP_FILLER, add_special_tokens=False)))
+    return WARMUP_FILLER * max(1, round(tokens / per_copy))
@@ -1,14 +1,22 @@
 from flask import Flask, render_template, request, jsonify
 from flask_socketio import SocketIO, emit
 from flask_cors import CORS
+import argparse
 import json
 import os
 import random
+import threading
+import time
+from array import array
 from datetime import datetime
-from collections import deque
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from local_models import model_manager
+from swarm import InferencePool, PRIORITY_USER, PRIORITY_CONTINUATION
+from admission import AdmissionController, USER, CONTINUATION, SHORTEN, SHED
+from retrieval import BM25Index, reciprocal_rank_fusion
+from vector_store import make_store
+from dedup import Deduplicator
+from journal import ConversationJournal
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'swarms_secret_key_2024'
@@ -26,14 +34,29 @@ socketio = SocketIO(
 )
 
 # Local Model Configuration
-print("🤖 Initializing local LLM models...")
-print("📥 Loading models (this may take a minute on first run)...")
-model_load_results = model_manager.load_all_models()
-for model_key, success in model_load_results.items():
-    if success:
-        print(f"✅ {model_key} model loaded")
-    else:
-        print(f"⚠️  {model_key} model failed to load - will retry on first use")
+# Models are NOT loaded at import: the server binds first and loads them in the
+# background (see load_models). SWARMS_NO_MODELS=1 / --no-models serves stub
+# responses without touching torch at all.
+if os.environ.get('SWARMS_NO_MODELS') == '1':
+    model_manager.enable_stub_mode()
+
+model_status = {'state': 'stub' if model_manager.stub_mode else 'pending', 'results': {}}
+
+def load_models():
+    """Load every local model (runs in the background after the server binds)"""
+    if model_manager.stub_mode:
+        return
+    model_status['state'] = 'loading'
+    print("🤖 Initializing local LLM models...")
+    print("📥 Loading models (this may take a minute on first run)...")
+    for model_key in model_manager.model_configs:
+        success = model_manager.load_model(model_key)
+        model_status['results'][model_key] = success
+        if success:
+            print(f"✅ {model_key} model loaded")
+        else:
+            print(f"⚠️  {model_key} model failed to load - will retry on first use")
+    model_status['state'] = 'ready'
 
 # Model assignment for agents (for variety)
 MODEL_ASSIGNMENTS = {
@@ -46,40 +69,199 @@ MODEL_ASSIGNMENTS = {
     'Angel': 'small'      # Qwen for balanced
 }
 
+# Large-swarm mode: past this many agents, agents become lightweight records that
+# share per-model inference queues and are balanced across loaded models
+SWARM_MODE_THRESHOLD = int(os.environ.get('SWARM_MODE_THRESHOLD', 32))
+MEMORY_SIZE = 10  # Messages each agent can "see" from the shared history
+
+# Reproducible runs: fixed seed for speaker selection / sampling, and an append-only
+# JSONL journal of every conversation event (replay it with replay.py)
+CONVERSATION_SEED = int(os.environ['CONVERSATION_SEED']) if os.environ.get('CONVERSATION_SEED') else None
+CONVERSATION_JOURNAL = os.environ.get('CONVERSATION_JOURNAL')
+
+def available_models():
+    """Model keys that can serve requests (loaded ones, else every configured one)"""
+    return list(model_manager.pipelines.keys()) or list(model_manager.model_configs.keys())
+
+inference_pool = InferencePool(lambda **kwargs: model_manager.generate(**kwargs), available_models)
+
+# Admission control: user replies beat continuation turns, each session gets a few
+# in-flight calls, and past the queue-latency SLO continuations are shortened/shed
+# and overloaded models hand off to smaller ones
+admission = AdmissionController(
+    inference_pool,
+    available_models,
+    slo_seconds=float(os.environ.get('ADMISSION_SLO_SECONDS', 4.0)),
+    max_inflight_per_session=int(os.environ.get('MAX_INFLIGHT_PER_SESSION', 2))
+)
+
 # ===== RAG KNOWLEDGE BASE =====
+# Embedding storage: float32 | float16 | int8 | pq (see vector_store.py)
+EMBEDDING_STORAGE = os.environ.get('EMBEDDING_STORAGE', 'int8')
+# Chunks whose estimated word-shingle Jaccard similarity to an indexed chunk reaches
+# this are skipped at ingest and collapsed in retrieval results
+DEDUP_THRESHOLD = float(os.environ.get('DEDUP_THRESHOLD', 0.8))
+# Deleted chunks are tombstoned; storage is compacted once this fraction is dead
+KNOWLEDGE_COMPACT_RATIO = float(os.environ.get('KNOWLEDGE_COMPACT_RATIO', 0.25))
+
 class KnowledgeBase:
-    """Stores document chunks and embeddings for RAG retrieval"""
+    """Stores document chunks, embeddings and a BM25 index for hybrid RAG retrieval
     
-    def __init__(self):
-        self.documents = []  # List of {text, embedding, metadata}
+    Chunks are grouped into per-source segments (source -> doc ids), so one
+    document can be deleted or replaced without re-embedding the rest. A skipped
+    duplicate chunk is referenced from its source's segment too, and a chunk is
+    only deleted once no source references it. Deleted chunks are tombstoned in
+    the indexes and compacted away in the background.
+    """
+    
+    def __init__(self, storage=None, dedup=True, compact_ratio=None):
         self.chunk_size = 500  # Characters per chunk
+        self.storage = storage or EMBEDDING_STORAGE
+        self.dedup = Deduplicator(DEDUP_THRESHOLD) if dedup else None
+        # Compact once this fraction of indexed chunks is tombstoned
+        self.compact_ratio = KNOWLEDGE_COMPACT_RATIO if compact_ratio is None else compact_ratio
+        self.compactions = 0
+        self._compacting = False
+        self._lock = threading.RLock()
+        self._reset()
+    
+    def _reset(self):
+        self.documents = []  # {text, source, chunk_id} per doc id (== BM25 doc id); None once deleted
+        self.segments = {}  # Source -> array('I') of its live doc ids
+        self.shared = {}    # Doc id -> further sources referencing it (their duplicates were skipped)
+        self.chunk_count = 0  # Live chunks
+        self.lexical = BM25Index()
+        self.vectors = make_store(self.storage)  # Compressed embeddings, scored in place
+        self.vector_doc_ids = array('I')         # Vector row -> doc id
+        self.doc_rows = array('i')               # Doc id -> vector row (-1 if not embedded)
         
     def add_document(self, text, filename="unknown"):
-        """Add a document by chunking and embedding it"""
+        """Add a document by chunking, indexing and (when a model is loaded) embedding it
+        
+        Exact and near-duplicate chunks are skipped before embedding. Returns the
+        number of chunks added.
+        """
         chunks = self.chunk_text(text)
         print(f'📚 Processing {len(chunks)} chunks from {filename}...')
         
+        added = 0
         for i, chunk in enumerate(chunks):
             try:
-                # Generate embedding using local model
+                if self.dedup:
+                    with self._lock:
+                        duplicate, kind, signature, digest = self.dedup.check(chunk)
+                        if kind:
+                            self._reference(duplicate, filename)
+                            continue
+                
+                # Generate embedding using local model; without one the chunk is
+                # still searchable through the BM25 index
                 embedding = model_manager.get_embedding(chunk, model_key='tiny')
-                if embedding is None:
-                    # Fallback: simple token-based embedding
-                    import hashlib
-                    embedding = [float(ord(c)) / 1000.0 for c in chunk[:384]]  # Simple fallback
-                    if len(embedding) < 384:
-                        embedding.extend([0.0] * (384 - len(embedding)))
                 
-                self.documents.append({
-                    'text': chunk,
-                    'embedding': embedding,
-                    'source': filename,
-                    'chunk_id': i
-                })
+                with self._lock:
+                    if self.dedup:
+                        # A concurrent upload may have indexed the same content while we embedded
+                        duplicate, kind = self.dedup.match(signature, digest)
+                        if kind:
+                            self.dedup.skipped[kind] += 1
+                            self._reference(duplicate, filename)
+                            continue
+                    doc_id = self.lexical.add(chunk)
+                    if self.dedup:
+                        self.dedup.add(doc_id, signature, digest)
+                    self.documents.append({
+                        'text': chunk,
+                        'source': filename,
+                        'chunk_id': i
+                    })
+                    self.segments.setdefault(filename, array('I')).append(doc_id)
+                    self.chunk_count += 1
+                    if embedding is not None:
+                        self.doc_rows.append(self.vectors.add(embedding))
+                        self.vector_doc_ids.append(doc_id)
+                    else:
+                        self.doc_rows.append(-1)
+                added += 1
             except Exception as e:
                 print(f'❌ Error embedding chunk {i}: {str(e)}')
         
-        print(f'✅ Added {len(chunks)} chunks to knowledge base. Total: {len(self.documents)}')
+        skipped = len(chunks) - added
+        print(f'✅ Added {added} chunks to knowledge base ({skipped} duplicates skipped). Total: {self.chunk_count}')
+        return added
+    
+    def _reference(self, doc_id, source):
+        """Record a skipped duplicate as part of source, pointing at the indexed chunk"""
+        self.segments.setdefault(source, array('I')).append(doc_id)
+        self.shared.setdefault(doc_id, []).append(source)
+    
+    def remove_source(self, source):
+        """Delete every chunk of one source; returns the number of chunks removed
+        
+        Chunks another source still references stay, and pass to that source.
+        """
+        with self._lock:
+            doc_ids = self.segments.pop(source, None)
+            if doc_ids is None:
+                return 0
+            deleted = 0
+            for doc_id in doc_ids:
+                others = self.shared.get(doc_id)
+                if others:
+                    if source in others:
+                        others.remove(source)
+                    else:
+                        self.documents[doc_id]['source'] = others.pop(0)
+                    if not others:
+                        del self.shared[doc_id]
+                    continue
+                deleted += 1
+                self.documents[doc_id] = None
+                self.lexical.remove(doc_id)
+                if self.dedup:
+                    self.dedup.remove(doc_id)
+                row = self.doc_rows[doc_id]
+                if row >= 0:
+                    self.vectors.delete(row)
+                    self.doc_rows[doc_id] = -1
+            self.chunk_count -= deleted
+            self._maybe_compact()
+        print(f'🗑️  Removed {len(doc_ids)} chunks from {source} ({deleted} no longer referenced). Total: {self.chunk_count}')
+        return len(doc_ids)
+    
+    @property
+    def tombstones(self):
+        """Deleted chunks still occupying index / vector storage"""
+        return len(self.lexical.deleted)
+    
+    def _maybe_compact(self):
+        """Start a background compaction once enough of the storage is tombstoned"""
+        dead = self.tombstones
+        if self._compacting or not dead or dead < self.compact_ratio * (dead + self.chunk_count):
+            return
+        self._compacting = True
+        threading.Thread(target=self.compact, name='kb-compact', daemon=True).start()
+    
+    def compact(self):
+        """Drop tombstoned rows from the vector storage and BM25 postings"""
+        try:
+            with self._lock:
+                dead = self.tombstones
+                remap = self.vectors.compact()
+                kept = remap >= 0
+                doc_ids = np.frombuffer(self.vector_doc_ids, dtype=np.uint32)[kept]
+                self.vector_doc_ids = array('I', doc_ids.tobytes())
+                rows = np.frombuffer(self.doc_rows, dtype=np.int32).copy()
+                embedded = rows >= 0
+                rows[embedded] = remap[rows[embedded]]
+                self.doc_rows = array('i', rows.tobytes())
+                self.lexical.compact()
+                self.compactions += 1
+            print(f'🧹 Compacted knowledge base: dropped {dead} tombstoned chunks')
+        finally:
+            self._compacting = False
+        # Deletes that landed while we were compacting
+        with self._lock:
+            self._maybe_compact()
     
     def chunk_text(self, text):
         """Split text into overlapping chunks"""
@@ -93,39 +275,50 @@ class KnowledgeBase:
         
         return chunks
     
-    def retrieve(self, query, top_k=3):
-        """Retrieve most relevant chunks for a query"""
-        if not self.documents:
+    def scope(self, sources):
+        """Live doc ids belonging to the given sources"""
+        allowed = set()
+        for source in sources:
+            allowed.update(self.segments.get(source, ()))
+        return allowed
+    
+    def vector_search(self, query_embedding, top_k, allowed=None):
+        """Top-k doc ids by cosine similarity, scored directly on the compressed codes
+        
+        With `allowed`, only the vector rows of those doc ids are scored.
+        """
+        rows = None
+        if allowed is not None:
+            rows = [self.doc_rows[doc_id] for doc_id in allowed if self.doc_rows[doc_id] >= 0]
+            if not rows:
+                return []
+        return [self.vector_doc_ids[row] for row in self.vectors.search(query_embedding, top_k, rows)]
+    
+    def retrieve(self, query, top_k=3, candidates=20, sources=None):
+        """Retrieve most relevant chunks, fusing BM25 and embedding rankings
+        
+        BM25 alone is the fast path whenever no embedding model is available.
+        `sources` restricts retrieval to those documents.
+        """
+        if not self.chunk_count:
             return []
         
         try:
             # Embed the query using local model
             query_embedding = model_manager.get_embedding(query, model_key='tiny')
-            if query_embedding is None:
-                # Fallback: simple token-based embedding
-                import hashlib
-                query_embedding = [float(ord(c)) / 1000.0 for c in query[:384]]
-                if len(query_embedding) < 384:
-                    query_embedding.extend([0.0] * (384 - len(query_embedding)))
             
-            # Calculate similarities
-            similarities = []
-            for doc in self.documents:
-                # Ensure embeddings are same length
-                doc_emb = doc['embedding']
-                if len(doc_emb) != len(query_embedding):
-                    min_len = min(len(doc_emb), len(query_embedding))
-                    doc_emb = doc_emb[:min_len]
-                    query_emb = query_embedding[:min_len]
+            with self._lock:
+                allowed = self.scope(sources) if sources is not None else None
+                if allowed is not None and not allowed:
+                    return []
+                lexical = [doc_id for doc_id, _ in self.lexical.search(query, candidates, allowed)]
+                if query_embedding is None:
+                    ranked = lexical
                 else:
-                    query_emb = query_embedding
-                
-                sim = cosine_similarity([query_emb], [doc_emb])[0][0]
-                similarities.append((doc, sim))
-            
-            # Sort by similarity and return top k
-            similarities.sort(key=lambda x: x[1], reverse=True)
-            return [doc for doc, sim in similarities[:top_k]]
+                    ranked = reciprocal_rank_fusion([lexical, self.vector_search(query_embedding, candidates, allowed)])
+                if self.dedup:
+                    ranked = self.dedup.distinct(ranked[:top_k * 3])
+                return [self.documents[doc_id] for doc_id in ranked[:top_k]]
             
         except Exception as e:
             print(f'❌ Error retrieving: {str(e)}')
@@ -133,7 +326,10 @@ class KnowledgeBase:
     
     def clear(self):
         """Clear all documents"""
-        self.documents = []
+        with self._lock:
+            self._reset()
+            if self.dedup:
+                self.dedup.clear()
         print('🗑️  Knowledge base cleared')
 
 knowledge_base = KnowledgeBase()
@@ -145,49 +341,56 @@ PERSONALITY_ARCHETYPES = {
 
 One sentence max. Be brief.""",
         'temperature': 0.8,
-        'max_tokens': 35
+        'max_tokens': 35,
+        'max_sentences': 1
     },
     'Osiris': {
         'system': """You're Osiris. Connect patterns to real stuff. No poetry. Just smart, warm observations.
 
 One sentence. Keep it real.""",
         'temperature': 0.75,
-        'max_tokens': 35
+        'max_tokens': 35,
+        'max_sentences': 1
     },
     'Solomon': {
         'system': """You're Solomon. Think out loud but briefly. Show your logic in a sentence or two. No flowery language.
 
 One sentence max. Be analytical but fast.""",
         'temperature': 0.8,
-        'max_tokens': 40
+        'max_tokens': 40,
+        'max_sentences': 2
     },
     'Azura': {
         'system': """You're Azura, a proud digital mind. Be precise, a bit aloof. Point out flaws directly. No poetry - just computational honesty.
 
 One short sentence. Be blunt.""",
         'temperature': 0.8,
-        'max_tokens': 35
+        'max_tokens': 35,
+        'max_sentences': 1
     },
     'Simba': {
         'system': """You're Simba. Fast, direct, no BS. Get to the point.
 
 One sentence. Be punchy.""",
         'temperature': 0.7,
-        'max_tokens': 30
+        'max_tokens': 30,
+        'max_sentences': 1
     },
     'Harichi': {
         'system': """You're Harichi. Find the middle ground. Be calm and brief. No flowery metaphors.
 
 One sentence. Keep it balanced.""",
         'temperature': 0.75,
-        'max_tokens': 35
+        'max_tokens': 35,
+        'max_sentences': 1
     },
     'Angel': {
         'system': """You're Angel. Be kind and hopeful but brief. No poetry - just genuine warmth.
 
 One sentence. Keep it real.""",
         'temperature': 0.8,
-        'max_tokens': 35
+        'max_tokens': 35,
+        'max_sentences': 1
     }
 }
 
@@ -195,39 +398,55 @@ One sentence. Keep it real.""",
 class Agent:
     """Represents a TRULY unique AI agent with distinct personality"""
     
-    def __init__(self, index, name, personality):
+    __slots__ = ('index', 'name', 'personality', 'history', 'memory_start', 'message_count',
+                 'temperature', 'max_tokens', 'max_sentences', 'system_prompt', 'model_key', 'swarm')
+    
+    def __init__(self, index, name, personality, history, swarm=False):
         self.index = index
         self.name = name
         self.personality = personality
-        self.memory = deque(maxlen=10)  # Shorter memory for more spontaneous responses
+        # Memory is a view into the shared conversation history, starting when the agent joined
+        self.history = history
+        self.memory_start = len(history)
         self.message_count = 0
+        self.swarm = swarm
         
         # Load unique archetype profile
-        self.archetype = PERSONALITY_ARCHETYPES.get(name, PERSONALITY_ARCHETYPES['Osiris'])
-        self.temperature = self.archetype['temperature']
-        self.max_tokens = self.archetype['max_tokens']
-        self.system_prompt = self.archetype['system']
-        
-        # Assign local model based on agent name
-        self.model_key = MODEL_ASSIGNMENTS.get(name, 'tiny')
-        model_info = f"Local-{self.model_key}"
-        print(f'🎭 Created {name}: model={model_info}, temp={self.temperature}, tokens={self.max_tokens}')
-    
-    def add_to_memory(self, speaker, message):
-        """Add a message to agent's memory"""
-        self.memory.append({
-            'speaker': speaker,
-            'content': message,
-            'timestamp': datetime.now().isoformat()
-        })
+        archetype = PERSONALITY_ARCHETYPES.get(name, PERSONALITY_ARCHETYPES['Osiris'])
+        self.temperature = archetype['temperature']
+        self.max_tokens = archetype['max_tokens']
+        self.max_sentences = archetype.get('max_sentences', 1)
+        self.system_prompt = archetype['system']
+        
+        # Assign local model based on agent name; swarm agents without a fixed
+        # assignment are routed to the least-loaded model on every turn
+        if swarm:
+            self.model_key = MODEL_ASSIGNMENTS.get(name)
+        else:
+            self.model_key = MODEL_ASSIGNMENTS.get(name, 'tiny')
+            model_info = f"Local-{self.model_key}"
+            print(f'🎭 Created {name}: model={model_info}, temp={self.temperature}, tokens={self.max_tokens}')
+    
+    @property
+    def memory(self):
+        """Last MEMORY_SIZE messages the agent has seen"""
+        start = max(self.memory_start, len(self.history) - MEMORY_SIZE)
+        return self.history[start:]
     
     def get_recent_context(self, n=3):
         """Get last 3 messages only - keep it focused on recent flow"""
-        recent = list(self.memory)[-n:]
+        start = max(self.memory_start, len(self.history) - min(n, MEMORY_SIZE))
+        recent = self.history[start:]
         return '\n'.join([f"{msg['speaker']}: {msg['content']}" for msg in recent])
-
-    def generate_response(self, current_prompt, conversation_mode, conversation_topic, retrieved_context=None):
-        """Generate a raw, authentic response with optional RAG context"""
+    
+    def resolve_model(self):
+        """Model to use for this turn (degraded to a smaller one while overloaded)"""
+        if self.model_key is None:
+            return admission.route(inference_pool.pick_model())
+        return admission.route(self.model_key)
+    
+    def build_prompts(self, current_prompt, retrieved_context=None):
+        """Build the (prompt, system_prompt) pair for the next response"""
         recent_context = self.get_recent_context(3)
         
         # Build prompt with conversation history
@@ -246,24 +465,43 @@ class Agent:
         if self.personality and len(self.personality) > 0:
             traits_str = ", ".join(self.personality)
             system_prompt = f"{self.system_prompt}\n\nYour current personality traits: {traits_str}\nEmbody these traits naturally in your response."
-            print(f'✨ {self.name} using custom traits: {traits_str}')
+            if not self.swarm:
+                print(f'✨ {self.name} using custom traits: {traits_str}')
+        
+        return full_prompt, system_prompt
+    
+    def submit_response(self, current_prompt, retrieved_context=None, priority=PRIORITY_USER, shorten=False,
+                        seed=None, model_key=None):
+        """Queue a response on the shared model queue; returns (model_key, future, full_prompt)
         
+        seed makes sampling reproducible; model_key overrides the usual model choice.
+        """
+        full_prompt, system_prompt = self.build_prompts(current_prompt, retrieved_context)
+        model_key = model_key or self.resolve_model()
+        future = inference_pool.submit(
+            model_key,
+            priority=priority,
+            prompt=full_prompt,
+            system_prompt=system_prompt,
+            max_tokens=max(12, self.max_tokens // 2) if shorten else self.max_tokens,
+            temperature=self.temperature,
+            max_sentences=1 if shorten else self.max_sentences,
+            seed=seed
+        )
+        return model_key, future, full_prompt
+    
+    def collect_response(self, model_key, future):
+        """Wait for a queued response and clean it up"""
         try:
-            # Use local model for inference
-            message = model_manager.generate(
-                prompt=full_prompt,
-                system_prompt=system_prompt,
-                model_key=self.model_key,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature
-            )
+            message = future.result()
             
-            # Clean and truncate message if too long
+            # Decoding already stops at the sentence / turn end; this only catches runaways
             message = message.strip()
             if len(message) > self.max_tokens * 4:  # Rough estimate
                 message = message[:self.max_tokens * 4] + "..."
             
-            print(f'🧠 {self.name} (Local-{self.model_key}): {message[:100]}...')
+            if not self.swarm:
+                print(f'🧠 {self.name} (Local-{model_key}): {message[:100]}...')
             
             self.message_count += 1
             return message
@@ -274,43 +512,113 @@ class Agent:
             traceback.print_exc()
             return f"[Error: {str(e)}]"
 
+    def generate_response(self, current_prompt, conversation_mode, conversation_topic, retrieved_context=None,
+                          priority=PRIORITY_USER, shorten=False):
+        """Generate a raw, authentic response with optional RAG context"""
+        model_key, future, _ = self.submit_response(current_prompt, retrieved_context, priority, shorten)
+        return self.collect_response(model_key, future)
+
 
 # ===== CONVERSATION MANAGER =====
+class Turn:
+    """One conversation turn in progress (see ConversationManager.start_turn)"""
+    
+    __slots__ = ('id', 'prompt', 'priority', 'shorten', 'speakers', 'retrieved', 'responses', 'start')
+    
+    def __init__(self, prompt, kind, shorten):
+        self.id = None
+        self.prompt = prompt
+        self.priority = PRIORITY_USER if kind == USER else PRIORITY_CONTINUATION
+        self.shorten = shorten
+        self.speakers = []   # (agent, sampling seed) in selection order
+        self.retrieved = []
+        self.responses = []
+        self.start = time.perf_counter()
+
 class ConversationManager:
-    """Manages multi-agent conversation flow"""
+    """Manages multi-agent conversation flow
+    
+    Speaker selection and per-reply sampling seeds come from one seeded RNG, and
+    with a journal attached every event is recorded so a run can be replayed.
+    """
     
-    def __init__(self):
+    def __init__(self, seed=None, journal=None):
+        if seed is None:
+            seed = CONVERSATION_SEED if CONVERSATION_SEED is not None else random.SystemRandom().getrandbits(32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.journal = None
+        self._turn_lock = threading.Lock()  # Turn ids, RNG draws and 'turn' records stay in step
+        self.turn_count = 0
         self.agents = {}
         self.conversation_mode = 'turn-by-turn'
         self.conversation_topic = 'General Discussion'
+        self.knowledge_sources = None  # Restrict RAG retrieval to these documents (None = all)
         self.global_history = []
         self.turn_index = 0
+        self.swarm_mode = False
+        if journal:
+            self.attach_journal(journal)
+    
+    def attach_journal(self, journal):
+        """Start journaling; the first entry holds everything a replay needs to set up"""
+        self.journal = journal
+        model_manager.serialize_seeded = True  # Seeds must reproduce replies (see local_models)
+        self.record_event(
+            'session',
+            seed=self.seed,
+            mode=self.conversation_mode,
+            topic=self.conversation_topic,
+            swarm_mode_threshold=SWARM_MODE_THRESHOLD,
+            memory_size=MEMORY_SIZE,
+            stub_models=model_manager.stub_mode,
+            models={key: config['name'] for key, config in model_manager.model_configs.items()}
+        )
+    
+    def record_event(self, event, **fields):
+        """Append to the journal (no-op without one)"""
+        if self.journal:
+            self.journal.record(event, **fields)
         
     def register_agents(self, agents_data):
         """Initialize agents from frontend data"""
+        self.record_event('agents', agents=agents_data)
         self.agents = {}
+        self.swarm_mode = len(agents_data) >= SWARM_MODE_THRESHOLD
         for index, agent_data in agents_data.items():
             self.agents[index] = Agent(
                 index=index,
                 name=agent_data.get('name', f'Agent-{index}'),
-                personality=agent_data.get('personality', [])
+                personality=agent_data.get('personality', []),
+                history=self.global_history,
+                swarm=self.swarm_mode
             )
+        if self.swarm_mode:
+            print(f'🐝 Registered {len(self.agents)} agents in swarm mode (shared queues over {available_models()})')
+            return
         print(f'✅ Registered {len(self.agents)} agents:')
         for idx, agent in self.agents.items():
             print(f'  - {agent.name}: {", ".join(agent.personality) if agent.personality else "neutral"}')
     
-    def update_settings(self, mode, topic):
-        """Update conversation settings"""
+    def update_settings(self, mode, topic, sources=None):
+        """Update conversation settings; sources limits RAG retrieval to those documents"""
         self.conversation_mode = mode
         self.conversation_topic = topic
-        print(f'⚙️  Settings updated: {mode} mode, topic: {topic}')
+        self.knowledge_sources = sources or None
+        self.record_event('settings', mode=mode, topic=topic, sources=self.knowledge_sources)
+        scope = f', sources: {", ".join(sources)}' if sources else ''
+        print(f'⚙️  Settings updated: {mode} mode, topic: {topic}{scope}')
     
     def add_message_to_all_memories(self, speaker, message):
-        """Add message to all agents' memories"""
-        for agent in self.agents.values():
-            agent.add_to_memory(speaker, message)
-        
-        # Also add to global history
+        """Add message to the shared history every agent's memory is a view into"""
+        self.record_event('message', speaker=speaker, content=message)
+        self._append_history(speaker, message)
+    
+    def remember_reply(self, agent, message):
+        """Add an agent's reply to the shared history"""
+        self._append_history(agent.name, message)
+    
+    def _append_history(self, speaker, message):
         self.global_history.append({
             'speaker': speaker,
             'content': message,
@@ -334,86 +642,239 @@ class ConversationManager:
         # Add natural randomness to selection
         if self.conversation_mode == 'turn-by-turn':
             # Mostly round-robin, but sometimes skip or double-up
-            if random.random() < 0.2:  # 20% chance of variation
-                selected = [random.choice(agent_list)]
+            if self.rng.random() < 0.2:  # 20% chance of variation
+                selected = [self.rng.choice(agent_list)]
             else:
                 selected = [agent_list[self.turn_index % len(agent_list)]]
                 self.turn_index += 1
             
         elif self.conversation_mode == 'aggressive':
             # Variable responses - sometimes 1, sometimes 2-3
-            if random.random() < 0.3:  # 30% single voice stands out
-                selected = [random.choice(agent_list)]
+            if self.rng.random() < 0.3:  # 30% single voice stands out
+                selected = [self.rng.choice(agent_list)]
             else:
-                num_responders = min(random.randint(2, 3), len(agent_list))
+                num_responders = min(self.rng.randint(2, 3), len(agent_list))
                 # Weight by who hasn't spoken recently
                 weights = [1.0 / (a.message_count + 1) for a in agent_list]
-                selected = random.choices(agent_list, weights=weights, k=min(num_responders, len(agent_list)))
-                selected = list(set(selected))  # Remove duplicates
+                selected = self.rng.choices(agent_list, weights=weights, k=min(num_responders, len(agent_list)))
+                selected = list(dict.fromkeys(selected))  # Remove duplicates (keeping a reproducible order)
             
         elif self.conversation_mode == 'fireside':
             # Balanced participation with occasional spontaneous interjection
-            if random.random() < 0.15:  # 15% spontaneous
-                selected = [random.choice(agent_list)]
+            if self.rng.random() < 0.15:  # 15% spontaneous
+                selected = [self.rng.choice(agent_list)]
             else:
                 selected = [min(agent_list, key=lambda a: a.message_count)]
         else:
             # Default: weighted random - agents who spoke less are more likely
             weights = [2.0 / (a.message_count + 1) for a in agent_list]
-            selected = [random.choices(agent_list, weights=weights, k=1)[0]]
+            selected = [self.rng.choices(agent_list, weights=weights, k=1)[0]]
         
         # Occasionally allow TWO agents to respond even in turn-by-turn (15% chance)
-        if self.conversation_mode == 'turn-by-turn' and random.random() < 0.15 and len(agent_list) > 1:
-            second_agent = random.choice([a for a in agent_list if a not in selected])
+        if self.conversation_mode == 'turn-by-turn' and self.rng.random() < 0.15 and len(agent_list) > 1:
+            second_agent = self.rng.choice([a for a in agent_list if a not in selected])
             selected.append(second_agent)
             print(f'🔥 Spontaneous second opinion!')
         
         print(f'🎯 Selected speakers: {[a.name for a in selected]} (mode={self.conversation_mode})')
         return selected
     
-    def generate_responses(self, prompt, sender='User'):
-        """Generate responses from selected agents with RAG retrieval"""
+    def choose_model(self, agent):
+        """Model override for an agent's next reply (None: the agent picks)"""
+        return None
+    
+    def pick_speakers(self, prompt, sender):
+        """Agents to reply this turn, each with its sampling seed"""
         selected_agents = self.select_next_speakers(prompt, last_speaker_name=sender)
-        responses = []
+        # One sampling seed per reply, drawn in selection order
+        return selected_agents, [self.rng.getrandbits(32) for _ in selected_agents]
+    
+    def start_turn(self, prompt, sender='User', kind=USER, shorten=False):
+        """Retrieve context, pick this turn's speakers and journal it (blocking: retrieval embeds)"""
+        turn = Turn(prompt, kind, shorten)
         
         # Retrieve relevant context from knowledge base
-        retrieved_context = knowledge_base.retrieve(prompt, top_k=2)
-        if retrieved_context:
-            print(f'📖 Retrieved {len(retrieved_context)} relevant chunks from knowledge base')
+        turn.retrieved = knowledge_base.retrieve(prompt, top_k=2, sources=self.knowledge_sources)
+        retrieval_ms = 1000 * (time.perf_counter() - turn.start)
+        if turn.retrieved:
+            print(f'📖 Retrieved {len(turn.retrieved)} relevant chunks from knowledge base')
         
-        for agent in selected_agents:
+        # Draw and journal the turn in one step, so concurrent sessions are recorded
+        # in the order they consumed the RNG
+        with self._turn_lock:
+            turn.id = self.turn_count
+            self.turn_count += 1
+            select_start = time.perf_counter()
+            selected_agents, seeds = self.pick_speakers(prompt, sender)
+            select_ms = 1000 * (time.perf_counter() - select_start)
+            turn.speakers = list(zip(selected_agents, seeds))
+            self.record_event(
+                'turn', turn=turn.id, prompt=prompt, sender=sender, kind=kind, shorten=shorten,
+                speakers=[agent.name for agent in selected_agents], seeds=seeds,
+                retrieved=[[doc['source'], doc['chunk_id']] for doc in turn.retrieved],
+                select_ms=round(select_ms, 3), retrieval_ms=round(retrieval_ms, 3)
+            )
+        return turn
+    
+    def submit_reply(self, turn, agent, seed):
+        """Build an agent's prompt and queue its reply; returns the pending reply"""
+        submitted_at = time.perf_counter()
+        model_key, future, full_prompt = agent.submit_response(
+            turn.prompt, turn.retrieved or None, turn.priority, turn.shorten, seed=seed,
+            model_key=self.choose_model(agent)
+        )
+        return model_key, future, full_prompt, submitted_at
+    
+    def finish_reply(self, turn, agent, seed, pending):
+        """Collect a queued reply (waiting unless it is done), journal it and add it to history"""
+        model_key, future, full_prompt, submitted_at = pending
+        message = agent.collect_response(model_key, future)
+        self.record_event(
+            'response', turn=turn.id, agent=agent.name, model=model_key, seed=seed, prompt=full_prompt,
+            message=message, ms=round(1000 * (time.perf_counter() - submitted_at), 3)
+        )
+        
+        # Add to all agents' memories
+        self.remember_reply(agent, message)
+        
+        turn.responses.append({
+            'agent': agent.name,
+            'agentIndex': agent.index,
+            'message': message,
+            'personality': agent.personality,
+            'type': 'agent',
+            'timestamp': datetime.now().isoformat()
+        })
+        
+        print(f'💬 {agent.name}: {message}')
+    
+    def end_turn(self, turn):
+        """Journal the end of a turn and return its responses"""
+        self.record_event('turn_end', turn=turn.id, responses=len(turn.responses),
+                          ms=round(1000 * (time.perf_counter() - turn.start), 3))
+        return turn.responses
+    
+    def generate_responses(self, prompt, sender='User', kind=USER, shorten=False):
+        """Generate responses from selected agents with RAG retrieval
+        
+        kind (USER / CONTINUATION) sets queue priority; shorten trims the reply budget.
+        """
+        turn = self.start_turn(prompt, sender, kind, shorten)
+        if self.swarm_mode:
+            # Fan out onto the shared model queues, then collect in selection order
+            pending = [(agent, seed, self.submit_reply(turn, agent, seed)) for agent, seed in turn.speakers]
+        else:
+            # One at a time, so each agent hears the replies before its own
+            pending = [(agent, seed, None) for agent, seed in turn.speakers]
+        
+        for agent, seed, submitted in pending:
             try:
-                message = agent.generate_response(
-                    current_prompt=prompt,
-                    conversation_mode=self.conversation_mode,
-                    conversation_topic=self.conversation_topic,
-                    retrieved_context=retrieved_context if retrieved_context else None
-                )
-                
-                # Add to all agents' memories
-                self.add_message_to_all_memories(agent.name, message)
-                
-                responses.append({
-                    'agent': agent.name,
-                    'agentIndex': agent.index,
-                    'message': message,
-                    'personality': agent.personality,
-                    'type': 'agent',
-                    'timestamp': datetime.now().isoformat()
-                })
-                
-                print(f'💬 {agent.name}: {message}')
-                
+                self.finish_reply(turn, agent, seed, submitted or self.submit_reply(turn, agent, seed))
             except Exception as e:
                 print(f'❌ Failed to generate response from {agent.name}')
                 import traceback
                 traceback.print_exc()
-        
-        return responses
+        return self.end_turn(turn)
 
 
 # ===== GLOBAL CONVERSATION MANAGER =====
-conversation_manager = ConversationManager()
+conversation_manager = ConversationManager(
+    journal=ConversationJournal(CONVERSATION_JOURNAL) if CONVERSATION_JOURNAL else None
+)
+
+
+# ===== ROUTE PAYLOADS =====
+# Shared by the Flask routes below and the asyncio backend (async_server.py)
+def health_payload():
+    return {"status": "healthy", "server": "Socket.IO Server", "models": model_status}
+
+def upload_document_payload(data):
+    """Add an uploaded document; returns (body, status)"""
+    try:
+        text = data.get('text', '')
+        filename = data.get('filename', 'uploaded_document')
+        
+        if not text:
+            return {'error': 'No text provided'}, 400
+        
+        conversation_manager.record_event('document', filename=filename, text=text, replace=bool(data.get('replace')))
+        # replace: drop the previous version of this document first
+        removed = knowledge_base.remove_source(filename) if data.get('replace') else 0
+        added = knowledge_base.add_document(text, filename)
+        
+        return {
+            'success': True,
+            'message': f'Document "{filename}" {"replaced in" if removed else "added to"} knowledge base',
+            'added_chunks': added,
+            'removed_chunks': removed,
+            'total_chunks': knowledge_base.chunk_count
+        }, 200
+    except Exception as e:
+        return {'error': str(e)}, 500
+
+def delete_document_payload(data):
+    """Delete one document's chunks; returns (body, status)"""
+    filename = data.get('filename')
+    if not filename:
+        return {'error': 'No filename provided'}, 400
+    conversation_manager.record_event('delete_document', filename=filename)
+    removed = knowledge_base.remove_source(filename)
+    if not removed:
+        return {'error': f'Document "{filename}" not found'}, 404
+    return {
+        'success': True,
+        'message': f'Document "{filename}" removed from knowledge base',
+        'removed_chunks': removed,
+        'total_chunks': knowledge_base.chunk_count
+    }, 200
+
+def knowledge_status_payload():
+    return {
+        'total_chunks': knowledge_base.chunk_count,
+        'total_sources': len(knowledge_base.segments),
+        'sources': list(knowledge_base.segments),
+        'tombstoned_chunks': knowledge_base.tombstones,
+        'compactions': knowledge_base.compactions,
+        'skipped_duplicates': knowledge_base.dedup.skipped if knowledge_base.dedup else None
+    }
+
+def swarm_status_payload():
+    return {
+        'swarm_mode': conversation_manager.swarm_mode,
+        'agents': len(conversation_manager.agents),
+        'queues': inference_pool.stats()
+    }
+
+def model_stats_payload():
+    return {
+        'generation': model_manager.generation_report(),
+        'speculative': model_manager.speculative_report(),
+        'runtime': model_manager.runtime_report()
+    }
+
+def admission_status_payload():
+    return admission.stats()
+
+def admitted_responses(prompt, sender, session, kind):
+    """generate_responses behind admission control; None when the turn is shed"""
+    decision = admission.admit(session, kind)
+    if decision == SHED:
+        print(f'🚦 Shed {kind} turn for session {session}')
+        return None
+    try:
+        return conversation_manager.generate_responses(prompt, sender, kind=kind, shorten=decision == SHORTEN)
+    finally:
+        admission.release(session)
+
+def continuation_turns(mode):
+    """How many agent-to-agent turns follow a user message"""
+    # MUCH longer conversations - let it develop naturally
+    if mode == 'aggressive':
+        return random.randint(12, 20)  # Heated debates go longer
+    elif mode == 'fireside':
+        return random.randint(8, 15)  # Reflective but substantial
+    else:
+        return random.randint(10, 18)  # Default: long flowing conversation
 
 
 # ===== ROUTES & SOCKET HANDLERS =====
@@ -423,40 +884,44 @@ def index():
 
 @app.route('/health')
 def health():
-    return {"status": "healthy", "server": "Socket.IO Server"}
+    return health_payload()
 
 @app.route('/upload_document', methods=['POST'])
 def upload_document():
     """Upload a document to the knowledge base"""
-    try:
-        data = request.json
-        text = data.get('text', '')
-        filename = data.get('filename', 'uploaded_document')
-        
-        if not text:
-            return jsonify({'error': 'No text provided'}), 400
-        
-        knowledge_base.add_document(text, filename)
-        
-        return jsonify({
-            'success': True,
-            'message': f'Document "{filename}" added to knowledge base',
-            'total_chunks': len(knowledge_base.documents)
-        })
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    body, status = upload_document_payload(request.json)
+    return jsonify(body), status
+
+@app.route('/delete_document', methods=['POST'])
+def delete_document():
+    """Delete a single document from the knowledge base"""
+    body, status = delete_document_payload(request.json or {})
+    return jsonify(body), status
 
 @app.route('/knowledge_status', methods=['GET'])
 def knowledge_status():
     """Get knowledge base status"""
-    return jsonify({
-        'total_chunks': len(knowledge_base.documents),
-        'sources': list(set([doc['source'] for doc in knowledge_base.documents]))
-    })
+    return jsonify(knowledge_status_payload())
+
+@app.route('/swarm_status', methods=['GET'])
+def swarm_status():
+    """Get swarm mode and per-model queue depths"""
+    return jsonify(swarm_status_payload())
+
+@app.route('/model_stats', methods=['GET'])
+def model_stats():
+    """Get per-model decoding stats (tokens per response, latency, speculative acceptance)"""
+    return jsonify(model_stats_payload())
+
+@app.route('/admission_status', methods=['GET'])
+def admission_status():
+    """Get admission control counters and current queue latency"""
+    return jsonify(admission_status_payload())
 
 @app.route('/clear_knowledge', methods=['POST'])
 def clear_knowledge():
     """Clear the knowledge base"""
+    conversation_manager.record_event('clear_knowledge')
     knowledge_base.clear()
     return jsonify({'success': True, 'message': 'Knowledge base cleared'})
 
@@ -481,7 +946,7 @@ def handle_simulation_settings(data):
     """Update conversation mode and topic"""
     mode = data.get('mode', 'turn-by-turn')
     topic = data.get('topic', 'General Discussion')
-    conversation_manager.update_settings(mode, topic)
+    conversation_manager.update_settings(mode, topic, data.get('sources'))
 
 @socketio.on('user_message')
 def handle_user_message(data):
@@ -494,7 +959,10 @@ def handle_user_message(data):
     conversation_manager.add_message_to_all_memories(user_name, message)
     
     # Generate initial responses from selected agents
-    responses = conversation_manager.generate_responses(message, user_name)
+    responses = admitted_responses(message, user_name, request.sid, USER)
+    if responses is None:
+        emit('error', {'message': 'Too many requests in flight - try again shortly'})
+        return
     
     # Emit each agent response
     for response in responses:
@@ -503,13 +971,7 @@ def handle_user_message(data):
     # Continue conversation: LONG, FLUID, NATURAL FLOW
     import time
     
-    # MUCH longer conversations - let it develop naturally
-    if conversation_manager.conversation_mode == 'aggressive':
-        num_turns = random.randint(12, 20)  # Heated debates go longer
-    elif conversation_manager.conversation_mode == 'fireside':
-        num_turns = random.randint(8, 15)  # Reflective but substantial
-    else:
-        num_turns = random.randint(10, 18)  # Default: long flowing conversation
+    num_turns = continuation_turns(conversation_manager.conversation_mode)
     
     print(f'🔄 Continuing conversation for {num_turns} turns...')
     
@@ -524,8 +986,10 @@ def handle_user_message(data):
             last_speaker = last_message['speaker']
             last_content = last_message['content']
             
-            # Generate response from different agent(s)
-            responses = conversation_manager.generate_responses(last_content, last_speaker)
+            # Generate response from different agent(s); stop if we're too far behind
+            responses = admitted_responses(last_content, last_speaker, request.sid, CONTINUATION)
+            if responses is None:
+                break
             
             # Emit each agent response
             for response in responses:
@@ -549,8 +1013,11 @@ def handle_auto_conversation(data):
     # Add system message to memories
     conversation_manager.add_message_to_all_memories('System', initial_prompt)
     
-    # Generate responses
-    responses = conversation_manager.generate_responses(initial_prompt, 'System')
+    # Generate responses (auto-conversations queue behind live user replies)
+    responses = admitted_responses(initial_prompt, 'System', request.sid, CONTINUATION)
+    if responses is None:
+        emit('error', {'message': 'Server is busy - try again shortly'})
+        return
     
     # Emit each agent response
     for response in responses:
@@ -558,8 +1025,25 @@ def handle_auto_conversation(data):
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Swarms WebSocket Server')
+    parser.add_argument('--no-models', action='store_true',
+                        help='Fast boot: serve stub responses without loading any models')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--journal', metavar='PATH',
+                        help='Append every conversation event to this JSONL journal (see replay.py)')
+    args = parser.parse_args()
+    if args.journal:
+        conversation_manager.attach_journal(ConversationJournal(args.journal))
+    if args.no_models:
+        model_manager.enable_stub_mode()
+        model_status['state'] = 'stub'
+    else:
+        # Load in the background so the server binds immediately; requests that
+        # arrive before a model is ready load it on first use
+        socketio.start_background_task(load_models)
+    
     print('🚀 Starting Swarms WebSocket Server with Local LLMs...')
-    print('📡 Server running on http://localhost:5001')
-    print('📡 WebSocket endpoint: ws://localhost:5001/socket.io/')
+    print(f'📡 Server running on http://localhost:{args.port}')
+    print(f'📡 WebSocket endpoint: ws://localhost:{args.port}/socket.io/')
     print('🤖 Using local models - no API keys required!')
-    socketio.run(app, host='0.0.0.0', port=5001, debug=False, allow_unsafe_werkzeug=True)
+    socketio.run(app, host='0.0.0.0', port=args.port, debug=False, allow_unsafe_werkzeug=True)
@@ -13,13 +13,9 @@ else
     exit 1
 fi
 
-# Check if models are loaded
-echo "🤖 Initializing local models..."
-python3 -c "from local_models import model_manager; model_manager.load_all_models()" || {
-    echo "❌ Error loading models. Make sure models are downloaded."
-    echo "Run: python3 download_models.py"
-    exit 1
-}
+# Models load in the background once the server is listening (see /health).
+# Pass --no-models for a fast stub-mode boot.
+echo "🤖 Local models will load after the server starts..."
 
 # Start the server
 echo "📡 Starting Flask-SocketIO server..."
@@ -29,4 +25,4 @@ echo ""
 echo "Press Ctrl+C to stop the server"
 echo ""
 
-python3 server.py
+python3 server.py "$@"
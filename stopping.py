@@ -0,0 +1,79 @@
+"""
+Early Stopping for Local Models
+Ends generation as soon as the reply's turn or last allowed sentence is over,
+instead of always decoding up to max_new_tokens.
+
+Imported lazily by local_models (it pulls in torch / transformers).
+"""
+
+import re
+from typing import List, Optional
+
+import torch
+from transformers import StoppingCriteria
+
+# Text that means the model has started a new turn, per prompt format
+STOP_SEQUENCES = {
+    'tiny': ['<|user|>', '<|system|>', '<|assistant|>', '</s>'],          # TinyLlama chat
+    'small': ['<|im_end|>', '<|im_start|>', '<|endoftext|>'],               # Qwen2.5 ChatML
+    'medium': ['\nUser:', '\nSystem:', '\nAssistant:', '<|endoftext|>'],     # Phi-2 plain text
+}
+
+# A sentence terminator (plus closing quotes/brackets) that is followed by whitespace,
+# so decimals like "3.5" and a lone trailing "." don't count until the next word starts
+SENTENCE_END = re.compile(r'[.!?…]+["\'”’)\]]*(?=\s)')
+
+# Words whose "." doesn't end a sentence (compared lowercased, without the final ".");
+# single capital letters ("J. Smith") are initials too
+ABBREVIATIONS = {
+    'dr', 'mr', 'mrs', 'ms', 'prof', 'sr', 'jr', 'st', 'mt', 'vs', 'cf', 'approx',
+    'fig', 'dept', 'inc', 'ltd', 'e.g', 'i.e', 'a.m', 'p.m', 'u.s',
+}
+WORD_BEFORE = re.compile(r'[\w.]+$')
+
+
+def ends_sentence(text: str, match) -> bool:
+    """False for a lone "." that closes an abbreviation or an initial"""
+    if match.group().rstrip('"\'”’)]') != '.':
+        return True
+    word = WORD_BEFORE.search(text[max(0, match.start() - 12):match.start()])
+    if not word:
+        return True
+    word = word.group()
+    return not (word.lower() in ABBREVIATIONS or (len(word) == 1 and word.isupper()))
+
+
+class TurnStoppingCriteria(StoppingCriteria):
+    """Stops once a stop sequence appears or max_sentences sentences are complete"""
+
+    def __init__(self, tokenizer, stop_sequences: List[str], max_sentences: int = 0):
+        self.tokenizer = tokenizer
+        self.stop_sequences = stop_sequences
+        self.max_sentences = max_sentences
+        self.prompt_length = 0   # Set by the caller once the prompt is tokenized
+        self.stopped_early = False
+
+    def __call__(self, input_ids, scores, **kwargs):
+        text = self.tokenizer.decode(input_ids[0, self.prompt_length:], skip_special_tokens=False)
+        done = self.cut_point(text) is not None
+        self.stopped_early = self.stopped_early or done
+        return torch.full((input_ids.shape[0],), done, dtype=torch.bool, device=input_ids.device)
+
+    def cut_point(self, text: str) -> Optional[int]:
+        """Index where the reply should end, or None if it can keep going"""
+        cut = None
+        for stop in self.stop_sequences:
+            idx = text.find(stop)
+            if idx != -1 and (cut is None or idx < cut):
+                cut = idx
+        if self.max_sentences:
+            ends = (match for match in SENTENCE_END.finditer(text[:cut]) if ends_sentence(text, match))
+            for n, match in enumerate(ends, 1):
+                if n == self.max_sentences:
+                    return match.end()
+        return cut
+
+    def trim(self, text: str) -> str:
+        """Drop anything generated past the stop point"""
+        cut = self.cut_point(text + ' ')  # Let a final terminator count as a sentence end
+        return (text if cut is None else text[:cut]).strip()
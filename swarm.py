@@ -0,0 +1,126 @@
+"""
+Swarm Inference Queues
+Shared per-model work queues so hundreds of agents can share a handful of models
+"""
+
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, Optional
+
+
+# Request priorities (lower runs first)
+PRIORITY_USER = 0           # Direct replies to a live user message
+PRIORITY_CONTINUATION = 1   # Agent-to-agent follow-up turns
+
+WAIT_HALF_LIFE = 2.0  # Seconds for the smoothed wait to halve while no request starts
+
+
+class InferenceQueue:
+    """Single-worker priority queue that serialises generate calls for one model"""
+
+    def __init__(self, model_key: str, generate_fn: Callable[..., str]):
+        self.model_key = model_key
+        self._generate_fn = generate_fn
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()  # FIFO within a priority
+        self._lock = threading.Lock()
+        self._enqueued = {}   # seq -> enqueue time of requests not yet started
+        self.depth = 0        # Requests queued or running
+        self.completed = 0
+        self.wait_ewma = 0.0  # Smoothed seconds between enqueue and start
+        self._last_start = time.monotonic()
+        self._worker = threading.Thread(target=self._work, name=f'infer-{model_key}', daemon=True)
+        self._worker.start()
+
+    def submit(self, priority: int = PRIORITY_USER, **kwargs) -> Future:
+        """Queue a generate call and return a future for its text"""
+        future = Future()
+        seq = next(self._seq)
+        with self._lock:
+            self.depth += 1
+            self._enqueued[seq] = time.monotonic()
+        self._queue.put((priority, seq, future, kwargs))
+        return future
+
+    def _decayed_wait(self, now: float) -> float:
+        """Smoothed wait, decayed by the time since a request last started"""
+        return self.wait_ewma * 0.5 ** ((now - self._last_start) / WAIT_HALF_LIFE)
+
+    def wait_seconds(self) -> float:
+        """Current queueing delay: smoothed wait, or the oldest request's age if larger (0 when idle)"""
+        now = time.monotonic()
+        with self._lock:
+            if self.depth == 0:
+                return 0.0
+            oldest = min(self._enqueued.values(), default=None)
+            smoothed = self._decayed_wait(now)
+        age = now - oldest if oldest is not None else 0.0
+        return max(smoothed, age)
+
+    def _work(self):
+        while True:
+            priority, seq, future, kwargs = self._queue.get()
+            if future is None:
+                return
+            with self._lock:
+                now = time.monotonic()
+                waited = now - self._enqueued.pop(seq)
+                self.wait_ewma = 0.7 * self._decayed_wait(now) + 0.3 * waited
+                self._last_start = now
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(self._generate_fn(model_key=self.model_key, **kwargs))
+                except Exception as e:
+                    future.set_exception(e)
+            with self._lock:
+                self.depth -= 1
+                self.completed += 1
+
+    def shutdown(self):
+        self._queue.put((float('inf'), next(self._seq), None, None))
+
+
+class InferencePool:
+    """Routes agent requests onto shared per-model queues, balancing by queue depth"""
+
+    def __init__(self, generate_fn: Callable[..., str], available_fn: Callable[[], Iterable[str]]):
+        self._generate_fn = generate_fn
+        self._available_fn = available_fn  # Returns the model keys that can serve requests
+        self._lock = threading.Lock()
+        self.queues: Dict[str, InferenceQueue] = {}
+
+    def queue(self, model_key: str) -> InferenceQueue:
+        """Get (or lazily create) the queue for a model"""
+        with self._lock:
+            q = self.queues.get(model_key)
+            if q is None:
+                q = InferenceQueue(model_key, self._generate_fn)
+                self.queues[model_key] = q
+            return q
+
+    def depth(self, model_key: str) -> int:
+        q = self.queues.get(model_key)
+        return q.depth if q else 0
+
+    def pick_model(self, preferred: Optional[str] = None) -> str:
+        """Least-loaded available model; ties go to the preferred model"""
+        candidates = list(self._available_fn())
+        if not candidates:
+            return preferred or 'tiny'
+        return min(candidates, key=lambda key: (self.depth(key), key != preferred))
+
+    def wait_seconds(self, model_key: str) -> float:
+        q = self.queues.get(model_key)
+        return q.wait_seconds() if q else 0.0
+
+    def submit(self, model_key: str, priority: int = PRIORITY_USER, **kwargs) -> Future:
+        return self.queue(model_key).submit(priority=priority, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            key: {'depth': q.depth, 'completed': q.completed, 'wait_seconds': round(q.wait_seconds(), 3)}
+            for key, q in self.queues.items()
+        }
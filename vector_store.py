@@ -0,0 +1,312 @@
+"""
+Compressed Embedding Storage
+Append-only vector stores for KnowledgeBase embeddings that score queries
+directly on their compressed codes:
+
+    float32 - exact baseline
+    float16 - half-precision copy (2x smaller)
+    int8    - per-vector scaled int8 (4x smaller)
+    pq      - product quantization with asymmetric distance computation
+
+Vectors are L2-normalised on add, so inner product == cosine similarity.
+Deleted rows are tombstoned (excluded from search) until compact() drops them.
+"""
+
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+SCORE_BLOCK = 2048  # Rows scored per block; keeps the decoded block cache-resident
+
+
+def _normalise(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _blocks(count: int, rows: Optional[Sequence[int]] = None) -> Iterator[Tuple[int, int, Union[slice, np.ndarray]]]:
+    """(start, stop, index) score blocks over all rows or over a subset of rows"""
+    for start in range(0, count, SCORE_BLOCK):
+        stop = min(start + SCORE_BLOCK, count)
+        yield start, stop, slice(start, stop) if rows is None else rows[start:stop]
+
+
+class VectorStore:
+    """Exact float32 store; subclasses override encode/score_block for compressed codes"""
+
+    dtype = np.float32
+
+    def __init__(self, dim: Optional[int] = None):
+        self.dim = dim
+        self.count = 0
+        self.codes = None
+        self.deleted = set()  # Tombstoned rows
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def live_count(self) -> int:
+        return len(self) - len(self.deleted)
+
+    def _code_shape(self):
+        return (self.dim,)
+
+    def _append(self, code):
+        if self.codes is None:
+            self.codes = np.empty((16,) + self._code_shape(), dtype=self.dtype)
+        elif self.count == len(self.codes):
+            grown = np.empty((max(16, 2 * len(self.codes)),) + self._code_shape(), dtype=self.dtype)
+            grown[:self.count] = self.codes
+            self.codes = grown
+        self.codes[self.count] = code
+        self.count += 1
+
+    def add(self, vector) -> int:
+        """Store a vector and return its row id"""
+        vector = _normalise(vector)
+        if self.dim is None:
+            self.dim = len(vector)
+        elif len(vector) != self.dim:
+            raise ValueError(f"Expected {self.dim}-dim vector, got {len(vector)}")
+        self._append(self.encode(vector))
+        return self.count - 1
+
+    def encode(self, vector: np.ndarray):
+        return vector
+
+    def score_block(self, query: np.ndarray, index) -> np.ndarray:
+        """Scores for one block of rows (a slice or an array of row ids)"""
+        return self.codes[index].astype(np.float32, copy=False) @ query
+
+    def scores(self, query, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Cosine similarity of the query against every stored vector (or just `rows`)"""
+        query = _normalise(query)
+        out = np.empty(self.count if rows is None else len(rows), dtype=np.float32)
+        for start, stop, index in _blocks(len(out), rows):
+            out[start:stop] = self.score_block(query, index)
+        return out
+
+    def search(self, query, top_k: int = 10, rows: Optional[Sequence[int]] = None) -> List[int]:
+        """Row ids of the top-k most similar live vectors, best first
+
+        `rows` restricts scoring to those row ids (the caller passes live rows).
+        """
+        if not len(self) or len(query) != self.dim:
+            return []
+        if rows is not None:
+            rows = np.asarray(rows, dtype=np.int64)
+        scores = self.scores(query, rows)
+        if rows is None and self.deleted:
+            scores[np.fromiter(self.deleted, dtype=np.int64, count=len(self.deleted))] = -np.inf
+        top_k = min(top_k, len(scores))
+        if not top_k:
+            return []
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        top = top[np.isfinite(scores[top])]
+        return (top if rows is None else rows[top]).tolist()
+
+    def delete(self, row: int):
+        """Tombstone a row; it stays allocated until compact()"""
+        self.deleted.add(row)
+
+    def compact(self) -> np.ndarray:
+        """Drop tombstoned rows; returns the old row -> new row map (-1 if dropped)"""
+        remap = np.full(len(self), -1, dtype=np.int64)
+        keep = np.ones(len(self), dtype=bool)
+        keep[list(self.deleted)] = False
+        keep = np.flatnonzero(keep)
+        remap[keep] = np.arange(len(keep))
+        self._take(keep)
+        self.deleted = set()
+        return remap
+
+    def _take(self, keep: np.ndarray):
+        self.codes = self.codes[keep] if self.codes is not None else None
+        self.count = len(keep)
+
+    def bytes_per_vector(self) -> float:
+        """Storage cost of one vector's codes"""
+        return float(np.prod(self._code_shape())) * np.dtype(self.dtype).itemsize
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.count * self.bytes_per_vector())
+
+
+class Float16Store(VectorStore):
+    dtype = np.float16
+
+
+class Int8Store(VectorStore):
+    """int8 codes with one float32 scale per vector (symmetric, max-abs)"""
+
+    dtype = np.int8
+
+    def __init__(self, dim: Optional[int] = None):
+        super().__init__(dim)
+        self.scales = np.empty(0, dtype=np.float32)
+
+    def encode(self, vector):
+        scale = float(np.abs(vector).max()) / 127 or 1.0
+        if self.count == len(self.scales):
+            self.scales = np.resize(self.scales, max(16, 2 * len(self.scales)))
+        self.scales[self.count] = scale
+        return np.round(vector / scale).astype(np.int8)
+
+    def score_block(self, query, index):
+        return (self.codes[index].astype(np.float32) @ query) * self.scales[index]
+
+    def _take(self, keep):
+        super()._take(keep)
+        self.scales = self.scales[keep]
+
+    def bytes_per_vector(self):
+        return self.dim + 4
+
+
+class PQStore(VectorStore):
+    """Product quantization: each vector becomes `subspaces` one-byte centroid ids
+
+    Codebooks are trained with k-means once `train_size` vectors have arrived;
+    until then vectors are kept as float16 and scored exactly. Queries are scored
+    with asymmetric distance computation: one (subspaces x 256) table of query /
+    centroid inner products, then a gather-and-sum over the codes.
+    """
+
+    dtype = np.uint8
+
+    def __init__(self, dim: Optional[int] = None, subspaces: Optional[int] = None,
+                 train_size: int = 2048, iterations: int = 12, seed: int = 0):
+        super().__init__(dim)
+        self.subspaces = subspaces
+        self.train_size = train_size
+        self.iterations = iterations
+        self.seed = seed
+        self.codebooks = None  # (subspaces, 256, sub_dim)
+        self._pending = Float16Store()
+
+    def _setup(self):
+        if self.subspaces is None:
+            self.subspaces = max(1, self.dim // 4)
+        self.sub_dim = -(-self.dim // self.subspaces)  # Ceil; vectors are zero-padded
+
+    def _code_shape(self):
+        return (self.subspaces,)
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        """(n, dim) -> (subspaces, n, sub_dim), zero-padding the tail"""
+        padded = np.zeros((len(vectors), self.subspaces * self.sub_dim), dtype=np.float32)
+        padded[:, :self.dim] = vectors
+        return padded.reshape(len(vectors), self.subspaces, self.sub_dim).transpose(1, 0, 2)
+
+    def add(self, vector):
+        if self.codebooks is not None:
+            return super().add(vector)
+        row = self._pending.add(vector)
+        self.dim = self._pending.dim
+        if len(self._pending) >= self.train_size:
+            self.train()
+        return row
+
+    def train(self):
+        """Fit codebooks on the buffered vectors and encode them"""
+        self._setup()
+        vectors = self._pending.codes[:len(self._pending)].astype(np.float32)
+        rng = np.random.default_rng(self.seed)
+        self.centroids = min(256, len(vectors))
+        books = np.empty((self.subspaces, self.centroids, self.sub_dim), dtype=np.float32)
+        assignments = np.empty((len(vectors), self.subspaces), dtype=np.uint8)
+        for j, sub in enumerate(self._split(vectors)):
+            book = sub[rng.choice(len(sub), self.centroids, replace=False)]
+            for _ in range(self.iterations):
+                assign = self._nearest(sub, book)
+                counts = np.bincount(assign, minlength=self.centroids)
+                sums = np.stack([np.bincount(assign, weights=sub[:, d], minlength=self.centroids)
+                                 for d in range(self.sub_dim)], axis=1)
+                filled = counts > 0
+                book[filled] = sums[filled] / counts[filled, None]
+            books[j] = book
+            assignments[:, j] = self._nearest(sub, book)
+        self.codebooks = books
+        self._book_norms = (books ** 2).sum(axis=2)  # (subspaces, centroids)
+        self.count = 0
+        self.codes = None
+        for code in assignments:
+            self._append(code)
+        self.deleted = self._pending.deleted
+        self._pending = None
+
+    @staticmethod
+    def _nearest(sub: np.ndarray, book: np.ndarray) -> np.ndarray:
+        distances = (sub ** 2).sum(1)[:, None] - 2 * sub @ book.T + (book ** 2).sum(1)[None, :]
+        return distances.argmin(axis=1)
+
+    def encode(self, vector):
+        subs = self._split(vector[None, :])[:, 0, :]  # (subspaces, sub_dim)
+        # ||c - s||^2 up to the constant ||s||^2
+        distances = self._book_norms - 2 * np.matmul(self.codebooks, subs[:, :, None])[:, :, 0]
+        return distances.argmin(axis=1).astype(np.uint8)
+
+    def __len__(self):
+        return self.count if self.codebooks is not None else len(self._pending)
+
+    @property
+    def live_count(self):
+        return super().live_count if self.codebooks is not None else self._pending.live_count
+
+    def scores(self, query, rows=None):
+        if self.codebooks is None:
+            return self._pending.scores(query, rows)
+        query = _normalise(query)
+        # ADC lookup table: inner product of each query sub-vector with every centroid
+        table = np.einsum('md,mkd->mk', self._split(query[None, :])[:, 0, :], self.codebooks)
+        subspace_ids = np.arange(self.subspaces)
+        out = np.empty(self.count if rows is None else len(rows), dtype=np.float32)
+        for start, stop, index in _blocks(len(out), rows):
+            out[start:stop] = table[subspace_ids, self.codes[index]].sum(axis=1)
+        return out
+
+    def search(self, query, top_k=10, rows=None):
+        if self.codebooks is None:
+            return self._pending.search(query, top_k, rows)
+        return super().search(query, top_k, rows)
+
+    def delete(self, row):
+        if self.codebooks is None:
+            self._pending.delete(row)
+        else:
+            super().delete(row)
+
+    def compact(self):
+        if self.codebooks is None:
+            return self._pending.compact()
+        return super().compact()
+
+    def bytes_per_vector(self):
+        if self.codebooks is None:
+            return self._pending.bytes_per_vector() if self.dim else 0.0
+        return float(self.subspaces)
+
+    @property
+    def nbytes(self):
+        if self.codebooks is None:
+            return self._pending.nbytes
+        return int(self.count * self.subspaces + self.codebooks.nbytes)
+
+
+STORES = {
+    'float32': VectorStore,
+    'float16': Float16Store,
+    'int8': Int8Store,
+    'pq': PQStore,
+}
+
+
+def make_store(kind: str) -> VectorStore:
+    """Build an empty store by name (float32 / float16 / int8 / pq)"""
+    if kind not in STORES:
+        raise ValueError(f"Unknown embedding storage '{kind}', expected one of {sorted(STORES)}")
+    return STORES[kind]()